@@ -31,8 +31,10 @@ a = Analysis(
         'Foundation',
         'objc',
         'sounddevice',
+        'soundfile',
         'numpy',
         'openai',
+        'httpx',
         'openai.resources',
         'openai.resources.audio',
         'openai.resources.audio.transcriptions',
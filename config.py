@@ -1,12 +1,48 @@
 # MySpeech Configuration
 # Values are loaded from ~/.config/myspeech/config.toml (created on first run)
 
-from myspeech.user_config import get
+from myspeech.user_config import get, subscribe
 
 # Server (mlx-audio)
 MLX_AUDIO_SERVER_URL = get("server", "url", "http://localhost:8000/v1")
 WHISPER_MODEL = get("server", "model", "mlx-community/whisper-large-v3-turbo")
 LANGUAGE = get("server", "language", "")
+AUDIO_FORMAT = get("server", "format", "wav")  # Upload format: "wav" or "flac"
+REQUEST_TIMEOUT = get("server", "timeout", 30.0)  # Read timeout for a 0 s clip; grows with clip length
+CONNECT_TIMEOUT = get("server", "connect_timeout", 2.0)
+MAX_RETRIES = get("server", "max_retries", 1)
+WARMUP = get("server", "warmup", True)
+SERVER_WORKERS = get("server", "workers", 1)  # Passed to mlx_audio.server --workers
+
+# Long clips are split at pauses and the chunks transcribed concurrently
+CHUNKING = get("chunking", "enabled", True)
+CHUNK_MIN_SECONDS = get("chunking", "min_seconds", 20.0)
+CHUNK_MAX_SECONDS = get("chunking", "max_seconds", 30.0)
+CHUNK_PARALLELISM = get("chunking", "parallelism", SERVER_WORKERS)  # Chunks in flight; defaults to the server's workers
+
+# Extra transcription servers (URLs or { url = "...", format = "flac" } tables),
+# ranked by recent latency and errors; slow requests are hedged to the next one
+EXTRA_ENDPOINTS = get("endpoints", "extra", [])
+HEDGE = get("endpoints", "hedge", True)
+HEDGE_PERCENTILE = get("endpoints", "hedge_percentile", 95)
+HEDGE_MIN_DELAY = get("endpoints", "hedge_min_delay", 0.3)
+
+# Model routing by clip duration, e.g. [{ max_seconds = 3.0, model = "..." }]
+# (clips longer than every route use WHISPER_MODEL)
+ROUTES = get("routing", "routes", [])
+
+# Transcription cache (repeat requests for the same audio return instantly)
+CACHE_ENABLED = get("cache", "enabled", True)
+CACHE_MAX_ENTRIES = get("cache", "max_entries", 256)
+CACHE_DISK = get("cache", "disk", False)
+CACHE_DIR = get("cache", "dir", "~/.cache/myspeech")
+CACHE_MAX_DISK_MB = get("cache", "max_disk_mb", 50)
+
+# Model residency: how long the model stays loaded on the server
+RESIDENCY_MODE = get("residency", "mode", "off")  # off, keep_warm, idle_unload, on_demand
+KEEP_WARM_INTERVAL = get("residency", "keep_warm_interval", 600)
+IDLE_UNLOAD_MINUTES = get("residency", "idle_minutes", 30)
+RESIDENCY_CHECK_INTERVAL = get("residency", "check_interval", 30)
 
 # Audio
 SAMPLE_RATE = get("audio", "sample_rate", 16000)
@@ -18,6 +54,40 @@ SAVE_RECORDING = get("audio", "save_recording", True)
 RECORDING_PATH = get("audio", "recording_path", "/tmp/myspeech_recording.wav")
 MIN_RECORDING_DURATION = get("audio", "min_duration", 0.5)
 MIN_AUDIO_LEVEL = get("audio", "min_level", 100)
+PREROLL_SECONDS = get("audio", "preroll", 0.0)
+# Open the device at its own rate/channels and convert to sample_rate/channels in the callback
+NATIVE_CAPTURE = get("audio", "native_format", True)
+# Stream lifecycle: "per_recording" (close when each recording stops), or opt in to keeping
+# the mic open with "idle" (close after stream_idle_seconds) or "always" (open at launch)
+STREAM_POLICY = get("audio", "stream_policy", "per_recording")
+STREAM_IDLE_SECONDS = get("audio", "stream_idle_seconds", 30.0)
+STREAM_BLOCKSIZE = get("audio", "blocksize", 0)  # Frames per callback at the device rate; 0 = PortAudio's choice
+STREAM_LATENCY = get("audio", "latency", "low")  # "low", "high" or seconds
+# Seconds between background rescans for added/removed devices while the mic is closed. Each rescan
+# restarts PortAudio and delays a hotkey press that lands during it, so 0 = only when the menu opens
+DEVICE_REFRESH_SECONDS = get("audio", "device_refresh", 0.0)
+
+# History of every dictation (compressed audio + transcript) in SQLite, searchable
+ARCHIVE_ENABLED = get("archive", "enabled", True)
+ARCHIVE_PATH = get("archive", "path", "~/Library/Application Support/MySpeech/history.db")
+ARCHIVE_MAX_MB = get("archive", "max_mb", 500)
+ARCHIVE_MAX_DAYS = get("archive", "max_days", 30)
+
+# Voice activity detection (trim silence, skip clips without speech)
+VAD_ENABLED = get("vad", "enabled", True)
+VAD_MIN_RMS = get("vad", "min_rms", 200)
+VAD_MIN_SPEECH = get("vad", "min_speech", 0.2)
+VAD_PADDING = get("vad", "padding", 0.2)
+
+# Dictation pipeline (back-to-back dictations are pasted in capture order)
+PIPELINE_WORKERS = get("pipeline", "workers", 2)
+PIPELINE_MAX_PENDING = get("pipeline", "max_pending", 8)
+
+# Streaming (transcribe segments while the hotkey is still held)
+STREAMING = get("streaming", "enabled", False)
+STREAM_PAUSE_SECONDS = get("streaming", "pause", 0.6)
+STREAM_MIN_SEGMENT = get("streaming", "min_segment", 5.0)
+STREAM_WORKERS = get("streaming", "workers", 2)
 
 # Hotkey configuration
 HOTKEY_MODIFIERS = get("hotkey", "modifiers", "cmd+ctrl")
@@ -25,7 +95,66 @@ HOTKEY_KEY = get("hotkey", "record_key", "t")
 HOTKEY_OPEN_RECORDING_KEY = get("hotkey", "open_recording_key", "r")
 HOTKEY_DEBOUNCE_SECONDS = get("hotkey", "debounce_seconds", 0.5)
 
+# Latency tracing (one JSONL record per dictation; empty path disables the file)
+TRACE_PATH = get("tracing", "path", "~/Library/Logs/MySpeech-traces.jsonl")
+MEMORY_SAMPLE_INTERVAL = get("tracing", "memory_interval", 10.0)
+MEMORY_SAMPLE_HISTORY = get("tracing", "memory_history", 360)
+
 # Clipboard
 PASTE_DELAY = get("clipboard", "paste_delay", 0.1)
 RESTORE_CLIPBOARD = get("clipboard", "restore_clipboard", True)
 RESTORE_DELAY = get("clipboard", "restore_delay", 1.1)
+
+# Settings updated in place when config.toml is edited while the app runs.
+# Components that cache derived state (Recorder, Transcriber, HotkeyListener)
+# subscribe to user_config themselves; this module is notified first.
+_LIVE_SETTINGS = {
+    "MLX_AUDIO_SERVER_URL": ("server", "url"),
+    "WHISPER_MODEL": ("server", "model"),
+    "LANGUAGE": ("server", "language"),
+    "REQUEST_TIMEOUT": ("server", "timeout"),
+    "CONNECT_TIMEOUT": ("server", "connect_timeout"),
+    "MAX_RETRIES": ("server", "max_retries"),
+    "EXTRA_ENDPOINTS": ("endpoints", "extra"),
+    "HEDGE": ("endpoints", "hedge"),
+    "HEDGE_PERCENTILE": ("endpoints", "hedge_percentile"),
+    "HEDGE_MIN_DELAY": ("endpoints", "hedge_min_delay"),
+    "ROUTES": ("routing", "routes"),
+    "CHUNKING": ("chunking", "enabled"),
+    "CHUNK_MIN_SECONDS": ("chunking", "min_seconds"),
+    "CHUNK_MAX_SECONDS": ("chunking", "max_seconds"),
+    "KEEP_WARM_INTERVAL": ("residency", "keep_warm_interval"),
+    "IDLE_UNLOAD_MINUTES": ("residency", "idle_minutes"),
+    "AUDIO_GAIN": ("audio", "gain"),
+    "NATIVE_CAPTURE": ("audio", "native_format"),
+    "STREAM_POLICY": ("audio", "stream_policy"),
+    "STREAM_IDLE_SECONDS": ("audio", "stream_idle_seconds"),
+    "STREAM_BLOCKSIZE": ("audio", "blocksize"),
+    "STREAM_LATENCY": ("audio", "latency"),
+    "SAVE_RECORDING": ("audio", "save_recording"),
+    "RECORDING_PATH": ("audio", "recording_path"),
+    "MIN_RECORDING_DURATION": ("audio", "min_duration"),
+    "MIN_AUDIO_LEVEL": ("audio", "min_level"),
+    "VAD_ENABLED": ("vad", "enabled"),
+    "VAD_MIN_RMS": ("vad", "min_rms"),
+    "VAD_MIN_SPEECH": ("vad", "min_speech"),
+    "VAD_PADDING": ("vad", "padding"),
+    "STREAM_PAUSE_SECONDS": ("streaming", "pause"),
+    "STREAM_MIN_SEGMENT": ("streaming", "min_segment"),
+    "HOTKEY_MODIFIERS": ("hotkey", "modifiers"),
+    "HOTKEY_KEY": ("hotkey", "record_key"),
+    "HOTKEY_OPEN_RECORDING_KEY": ("hotkey", "open_recording_key"),
+    "HOTKEY_DEBOUNCE_SECONDS": ("hotkey", "debounce_seconds"),
+    "PASTE_DELAY": ("clipboard", "paste_delay"),
+    "RESTORE_CLIPBOARD": ("clipboard", "restore_clipboard"),
+    "RESTORE_DELAY": ("clipboard", "restore_delay"),
+}
+
+
+def _apply_live_settings(changed: set[tuple[str, str]]):
+    for name, (section, key) in _LIVE_SETTINGS.items():
+        if (section, key) in changed:
+            globals()[name] = get(section, key)
+
+
+subscribe(_apply_live_settings)
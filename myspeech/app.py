@@ -4,18 +4,22 @@ import subprocess
 import sys
 import signal
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-
-import sounddevice as sd
+from typing import TYPE_CHECKING, Callable
 
 import config
 
+# Startup clock for the "ready" log line; heavy modules are imported after this
+_LAUNCHED = time.monotonic()
+
 # Setup logging to file for packaged app
 LOG_PATH = Path.home() / "Library/Logs/MySpeech.log"
 LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s",
+    format="%(asctime)s.%(msecs)03d %(levelname)s: %(message)s",
     datefmt="%H:%M:%S",
     handlers=[
         logging.FileHandler(LOG_PATH),
@@ -24,13 +28,26 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
-from myspeech.recorder import Recorder
-from myspeech.transcriber import Transcriber
-from myspeech.hotkey import HotkeyListener, check_accessibility_permissions, show_accessibility_dialog
+# Only light modules here. sounddevice, numpy, openai/httpx and pynput/Quartz
+# are imported by _load_components() on a background thread while the
+# server starts (see scripts/bench_import.py for the import-time budget).
+from myspeech import user_config
 from myspeech.appkit_runner import AppKitRunner
 from myspeech.clipboard import ClipboardManager
-from myspeech.server import ServerManager, get_system_memory, get_process_memory_mb, show_server_not_found_dialog
+from myspeech.server import ServerManager, show_server_not_found_dialog
+from myspeech.resources import ResourceSampler, default_provider
 from myspeech.menubar import MenuBar, get_app_version
+from myspeech.streaming import StreamingSession
+from myspeech.tracing import Tracer
+from myspeech.pipeline import DictationJob, DictationPipeline
+
+if TYPE_CHECKING:
+    from myspeech.archive import RecordingArchive
+    from myspeech.devices import DeviceRegistry
+    from myspeech.hotkey import HotkeyListener
+    from myspeech.recorder import Recorder
+    from myspeech.residency import ResidencyManager
+    from myspeech.transcriber import Transcriber
 
 
 def show_no_audio_input_dialog():
@@ -68,24 +85,56 @@ def show_no_audio_input_dialog():
 class MySpeechApp:
     def __init__(self):
         self._server = ServerManager()
-        self._recorder = Recorder()
-        self._transcriber = Transcriber()
+        # Created by _load_components() so importing this module stays cheap
+        self._devices: DeviceRegistry | None = None
+        self._recorder: Recorder | None = None
+        self._transcriber: Transcriber | None = None
+        self._residency: ResidencyManager | None = None
+        self._archive: RecordingArchive | None = None
         self._runner = AppKitRunner()
-        self._clipboard = ClipboardManager()
         self._menubar: MenuBar | None = None
         self._hotkey: HotkeyListener | None = None
         self._lock = threading.Lock()
         self._record_ready = threading.Semaphore(0)  # Ensures stop waits for start
+        self._stream_pool = ThreadPoolExecutor(max_workers=config.STREAM_WORKERS) if config.STREAMING else None
+        self._clipboard_pool = ThreadPoolExecutor(max_workers=1)
+        self._tracer = Tracer(Path(config.TRACE_PATH).expanduser() if config.TRACE_PATH else None)
+        self._clipboard = ClipboardManager(self._tracer)
+        self._resources = ResourceSampler(
+            default_provider(self._server), config.MEMORY_SAMPLE_INTERVAL, config.MEMORY_SAMPLE_HISTORY
+        )
+        self._pipeline = DictationPipeline(
+            self._process_transcription,
+            self._deliver,
+            workers=config.PIPELINE_WORKERS,
+            max_pending=config.PIPELINE_MAX_PENDING,
+        )
+        self._job: DictationJob | None = None
 
     def _on_record_start(self):
-        log.info("Hotkey pressed - starting recording")
-        # Save frontmost app immediately (before any UI changes)
-        threading.Thread(target=self._clipboard.save, daemon=True).start()
-
-        # Start recording directly (we're already in a daemon thread)
+        # Released whatever happens: _on_record_stop blocks the dispatcher until it is
         try:
+            trace = self._tracer.begin()
+            if self._hotkey and self._hotkey.detected_at:
+                trace.add_span("hotkey", self._hotkey.detected_at)
+            log.info(f"Hotkey pressed - starting recording (trace {trace.id})")
+            self._residency.touch()
+            # Save frontmost app immediately (before any UI changes); the job keeps its own copy
+            job = self._pipeline.begin(trace, self._clipboard_pool.submit(self._clipboard.save))
+
+            # Start recording directly (we're on the hotkey dispatcher thread)
             with self._lock:
-                self._recorder.start()
+                self._job = job
+                with trace.span("stream_open"):
+                    self._recorder.ensure_stream()
+                trace.mark("capture")
+                if self._stream_pool:
+                    job.session = StreamingSession(
+                        self._stream_pool, self._transcribe, self._recorder.encode_segment
+                    )
+                    self._recorder.start(on_segment=job.session.submit)
+                else:
+                    self._recorder.start()
         finally:
             self._record_ready.release()  # Signal that recorder.start() has been called
 
@@ -96,47 +145,90 @@ class MySpeechApp:
     def _on_record_stop(self):
         # Wait for recorder.start() to be called before stopping (handles rapid press-release)
         self._record_ready.acquire()
-        # Stop recording directly (we're already in a daemon thread)
+        release = time.monotonic()
         with self._lock:
-            audio_bytes = self._recorder.stop()
-
-        # Update menu bar to show not recording
-        if self._menubar:
-            self._menubar.set_recording(False)
-
-        if not audio_bytes:
-            self._clipboard.restore()
+            job, self._job = self._job, None
+        if job is None:
+            log.warning("Hotkey released but no dictation was started")
             return
 
-        # Transcribe in background to not block
-        threading.Thread(
-            target=self._process_transcription,
-            args=(audio_bytes,),
-            daemon=True,
-        ).start()
-
-    def _process_transcription(self, audio_bytes: bytes):
-        log.info("Transcribing...")
-        text = self._transcriber.transcribe(audio_bytes)
+        # Every begun job must reach submit() or skip(), or later dictations never get delivered
+        try:
+            with self._lock:
+                trace = job.trace
+                trace.mark("release", release)
+                trace.add_span("capture", trace.marks.get("capture", release), release)
+                with trace.span("encode"):
+                    job.audio_bytes = self._recorder.stop()
+                job.recording = self._recorder.last_recording
+            if job.recording is not None and len(job.recording):
+                self._archive.save_last(job.recording)  # Openable while it is transcribed
+
+            # Update menu bar to show not recording
+            if self._menubar:
+                self._menubar.set_recording(False)
+
+            if job.session and not job.session.has_segments:
+                job.session = None
+        except Exception as e:
+            log.error(f"Stopping dictation {job.seq} failed: {e}")
+            job.audio_bytes, job.session = b"", None
+
+        if not job.audio_bytes and not job.session:
+            self._pipeline.skip(job)
+            return
 
-        if text:
-            log.info(f"Result: {text}")
-            self._clipboard.set_and_paste(text)
+        # Transcription runs on the pipeline workers; results are pasted in capture order
+        self._pipeline.submit(job)
+
+    def _transcribe(self, audio_bytes: bytes) -> str | None:
+        # Waits for the launch load, or a reload if the residency policy unloaded the model
+        if not self._residency.ensure_loaded():
+            log.error("Server is not loaded, cannot transcribe")
+            return None
+        return self._transcriber.transcribe(audio_bytes)
+
+    def _process_transcription(self, job: DictationJob):
+        log.info(f"Transcribing dictation {job.seq}...")
+        with job.trace.span("transcribe"):
+            if job.session:
+                job.text = job.session.finish(job.audio_bytes)
+            else:
+                job.text = self._transcribe(job.audio_bytes)
+
+    def _deliver(self, job: DictationJob):
+        state = job.clipboard_state()
+        if not job.transcribe:
+            self._clipboard.restore(state, job.trace)
+            outcome = "rejected"
+        elif job.text:
+            log.info(f"Result: {job.text}")
+            self._clipboard.set_and_paste(job.text, state, job.trace)
+            outcome = "pasted"
         else:
             log.warning("No transcription result.")
-            self._clipboard.restore()
+            self._clipboard.restore(state, job.trace)
+            outcome = "empty"
+        self._tracer.finish(job.trace, outcome)
+
+        if job.recording is not None and len(job.recording):
+            model = self._transcriber.model_for(job.audio_bytes) if job.transcribe else None
+            self._archive.submit(job.recording, outcome, job.text, model, job.trace.durations())
 
         # Show memory stats after transcription
-        self._log_memory_stats()
+        if job.transcribe:
+            self._log_memory_stats()
 
     def _log_memory_stats(self):
-        """Log current memory usage stats."""
-        server_mb = self._server.get_memory_mb() or 0
-        app_mb = get_process_memory_mb(os.getpid())
-        mem = get_system_memory()
-        if mem:
-            total, used, _ = mem
-            log.info(f"RAM: {used * 100 // total}% ({used:,} / {total:,} MB) | App: {app_mb} MB | MLX: {server_mb:,} MB")
+        """Log the sampler's cached reading; sampling itself runs on its own interval."""
+        sample = self._resources.latest()
+        if sample and sample.system:
+            total, used, _ = sample.system
+            server_mb = sample.server_mb or 0
+            log.info(
+                f"RAM: {used * 100 // total}% ({used:,} / {total:,} MB) | App: {sample.app_mb} MB | "
+                f"MLX: {server_mb:,} MB ({time.monotonic() - sample.taken:.0f}s ago)"
+            )
 
     def _on_open_recording(self):
         try:
@@ -144,33 +236,85 @@ class MySpeechApp:
         except Exception:
             pass
 
+    def _load_components(self):
+        """Import the heavy modules and build the audio/transcription components."""
+        start = time.monotonic()
+        from myspeech.devices import DeviceRegistry
+        from myspeech.recorder import Recorder
+        from myspeech.transcriber import Transcriber
+        from myspeech.residency import ResidencyManager
+        from myspeech.archive import RecordingArchive
+        import myspeech.hotkey  # noqa: F401  (pynput/Quartz, needed once the event loop runs)
+
+        # PortAudio is only re-initialised to find new devices while no stream is open
+        self._devices = DeviceRegistry(config.DEVICE_REFRESH_SECONDS, lambda: not self._recorder.stream_open)
+        self._recorder = Recorder(self._devices)
+        self._transcriber = Transcriber()
+        self._residency = ResidencyManager(self._server, self._transcriber)
+        self._archive = RecordingArchive(
+            Path(config.ARCHIVE_PATH).expanduser() if config.ARCHIVE_ENABLED else None,
+            config.ARCHIVE_MAX_MB,
+            config.ARCHIVE_MAX_DAYS,
+        )
+        log.info(f"Components loaded in {time.monotonic() - start:.2f}s")
+
+    def _fail(self, message: str, dialog: Callable[[], None]):
+        """Report a startup failure from a background thread and quit."""
+        log.error(message)
+
+        def show_and_exit():
+            dialog()
+            os._exit(1)
+
+        self._runner.schedule(show_and_exit)
+
+    def _on_server_loaded(self, ok: bool):
+        if not ok:
+            self._fail("Cannot start without mlx-audio server. Exiting.", show_server_not_found_dialog)
+            return
+        self._resources.refresh()
+
+    def _probe_audio_device(self):
+        """Log the input device, or quit if there is none."""
+        snapshot = self._devices.snapshot
+        self._devices.start()
+        if config.AUDIO_DEVICE is not None:
+            device = snapshot.get(config.AUDIO_DEVICE)
+            log.info(f"Audio input: {device.label if device else f'[{config.AUDIO_DEVICE}] (not found)'}")
+        else:
+            if snapshot.default is None:
+                self._fail("No default audio input device found", show_no_audio_input_dialog)
+                return
+            log.info(f"Audio input: Default ({snapshot.default.label})")
+
     def run(self):
         log.info(f"MySpeech v{get_app_version()} starting...")
+        user_config.start_watcher()
 
-        # Ensure server is running
-        if not self._server.start():
+        # Import and build components while we check for the server
+        loader = threading.Thread(target=self._load_components, name="component-loader", daemon=True)
+        loader.start()
+        if not self._server.can_start():
             log.error("Cannot start without mlx-audio server. Exiting.")
             show_server_not_found_dialog()
             os._exit(1)
-
-        # Display server info
+        loader.join()
         log.info(f"Model: {config.WHISPER_MODEL}")
-        self._log_memory_stats()
+
+        # Start the server (and warm the model) in the background; the hotkey is
+        # live right away and early dictations queue until the server is ready.
+        # on_demand residency defers the server to the first dictation.
+        if self._residency.loads_at_launch:
+            self._residency.load_in_background(on_done=self._on_server_loaded)
+        self._residency.start()
+        self._resources.start()
+        threading.Thread(target=self._probe_audio_device, name="device-probe", daemon=True).start()
 
         log.info("MySpeech started. Cmd+Ctrl+T: record, Cmd+Ctrl+R: open recording")
 
-        # Log audio input device
-        if config.AUDIO_DEVICE is not None:
-            device_info = sd.query_devices(config.AUDIO_DEVICE)
-            log.info(f"Audio input: [{config.AUDIO_DEVICE}] {device_info['name']}")
-        else:
-            default_idx = sd.default.device[0]
-            if default_idx < 0:
-                log.error("No default audio input device found")
-                show_no_audio_input_dialog()
-                os._exit(1)
-            device_info = sd.query_devices(default_idx)
-            log.info(f"Audio input: Default ([{default_idx}] {device_info['name']})")
+        # Pre-roll and the "always" policy need the stream running before the first press
+        if self._recorder.stream_policy == "always":
+            self._recorder.ensure_stream()
 
         # Setup native macOS app on main thread
         self._runner.setup()
@@ -179,6 +323,8 @@ class MySpeechApp:
         self._menubar = MenuBar(self)
 
         def deferred_setup():
+            from myspeech.hotkey import HotkeyListener, check_accessibility_permissions, show_accessibility_dialog
+
             self._menubar.setup(quit_callback=self._runner.stop)
 
             # Check accessibility permissions inside the event loop
@@ -196,6 +342,7 @@ class MySpeechApp:
                 on_open_recording=self._on_open_recording,
             )
             self._hotkey.start()
+            log.info(f"Hotkey listener ready {time.monotonic() - _LAUNCHED:.2f}s after launch")
 
         self._runner.schedule_delayed(100, deferred_setup)
 
@@ -210,7 +357,14 @@ class MySpeechApp:
         finally:
             if self._hotkey:
                 self._hotkey.stop()
-            self._recorder._close_stream()
+            self._residency.stop()
+            self._pipeline.stop()
+            self._archive.stop()
+            self._resources.stop()
+            self._devices.stop()
+            self._clipboard.flush()
+            self._recorder.close()
+            self._transcriber.close()
             self._server.stop()
             log.info("MySpeech stopped.")
 
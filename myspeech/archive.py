@@ -0,0 +1,186 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import config
+from myspeech.encoder import encode, encode_wav, flac_available
+
+if TYPE_CHECKING:
+    import numpy as np
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    model TEXT,
+    text TEXT,
+    timings TEXT,
+    format TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    audio BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recordings_created ON recordings(created);
+"""
+
+# External-content FTS index over recordings.text, kept in sync by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5(text, content='recordings', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS recordings_ai AFTER INSERT ON recordings BEGIN
+    INSERT INTO transcripts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS recordings_ad AFTER DELETE ON recordings BEGIN
+    INSERT INTO transcripts(transcripts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+@dataclass
+class ArchiveEntry:
+    audio: "np.ndarray"  # Raw capture (int16, samples x channels)
+    outcome: str  # pasted, empty or rejected
+    text: str | None = None
+    model: str | None = None
+    timings: dict[str, float] = field(default_factory=dict)  # Seconds per traced stage
+    created: float = field(default_factory=time.time)
+
+
+def connect(path: Path) -> tuple[sqlite3.Connection, bool]:
+    """Open (and create) the archive database. Returns the connection and whether FTS5 is available."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(_SCHEMA)
+    try:
+        db.executescript(_FTS_SCHEMA)
+        return db, True
+    except sqlite3.OperationalError as e:
+        log.warning(f"SQLite FTS5 unavailable, history search falls back to LIKE: {e}")
+        return db, False
+
+
+def search(db: sqlite3.Connection, query: str, limit: int = 20, fts: bool = True) -> list[sqlite3.Row]:
+    """Most recent recordings whose transcript matches `query` (FTS5 syntax when available)."""
+    db.row_factory = sqlite3.Row
+    columns = "r.id, r.created, r.duration, r.outcome, r.model, r.text, r.timings, r.format, r.size"
+    if fts:
+        sql = (f"SELECT {columns} FROM transcripts t JOIN recordings r ON r.id = t.rowid "
+               "WHERE transcripts MATCH ? ORDER BY r.created DESC LIMIT ?")
+        return db.execute(sql, (query, limit)).fetchall()
+    sql = f"SELECT {columns} FROM recordings r WHERE r.text LIKE ? ORDER BY r.created DESC LIMIT ?"
+    return db.execute(sql, (f"%{query}%", limit)).fetchall()
+
+
+class RecordingArchive:
+    """Write-behind store for recordings and their transcripts.
+
+    save_last() and submit() only queue work for a single worker thread.
+    save_last() runs when a recording stops and writes it to RECORDING_PATH
+    if SAVE_RECORDING is on, so "Open Recording" shows it while it is being
+    transcribed. submit() runs after delivery and, when a database path is
+    set, stores the compressed audio with its transcript, timings and model
+    in SQLite, then evicts entries past the age or size limit.
+    """
+
+    def __init__(self, db_path: Path | None, max_mb: float, max_days: float):
+        self._db_path = db_path
+        self._max_bytes = int(max_mb * 1024 * 1024)
+        self._max_age = max_days * 86400
+        self._format = "flac" if flac_available() else "wav"
+        self._queue: "queue.Queue[ArchiveEntry | np.ndarray | None]" = queue.Queue()  # ndarray: save_last()
+        self._thread = threading.Thread(target=self._run, name="recording-archive", daemon=True)
+        self._thread.start()
+
+    def save_last(self, audio: "np.ndarray"):
+        """Queue writing a just-stopped recording to RECORDING_PATH; returns immediately."""
+        if config.SAVE_RECORDING:
+            self._queue.put(audio)
+
+    def submit(
+        self,
+        audio: "np.ndarray",
+        outcome: str,
+        text: str | None = None,
+        model: str | None = None,
+        timings: dict[str, float] | None = None,
+    ):
+        """Queue a finished dictation; returns immediately."""
+        self._queue.put(ArchiveEntry(audio, outcome, text, model, timings or {}))
+
+    def stop(self, timeout: float = 5.0):
+        """Flush queued entries and stop the worker."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        db = None
+        if self._db_path is not None:
+            try:
+                db, _fts = connect(self._db_path)
+            except sqlite3.Error as e:
+                log.error(f"Cannot open recording archive {self._db_path}: {e}")
+        while (entry := self._queue.get()) is not None:
+            start = time.monotonic()
+            try:
+                if not isinstance(entry, ArchiveEntry):
+                    self._write_last(entry)
+                    continue
+                if db is None:
+                    continue
+                self._store(db, entry)
+                self._evict(db)
+            except Exception as e:
+                # Encoder (soundfile) errors included: one bad entry must not stop the worker
+                log.warning(f"Archiving recording failed: {e}")
+                continue
+            log.debug(f"Archived recording in {time.monotonic() - start:.3f}s")
+        if db is not None:
+            db.close()
+
+    def _write_last(self, audio: "np.ndarray"):
+        with open(config.RECORDING_PATH, "wb") as f:
+            f.write(encode_wav(audio))
+
+    def _store(self, db: sqlite3.Connection, entry: ArchiveEntry):
+        audio = encode(entry.audio, self._format)
+        with db:
+            db.execute(
+                "INSERT INTO recordings (created, duration, outcome, model, text, timings, format, size, audio) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.created,
+                    len(entry.audio) / config.SAMPLE_RATE,
+                    entry.outcome,
+                    entry.model,
+                    entry.text,
+                    json.dumps({name: round(seconds * 1000, 1) for name, seconds in entry.timings.items()}),
+                    self._format,
+                    len(audio),
+                    audio,
+                ),
+            )
+
+    def _evict(self, db: sqlite3.Connection):
+        with db:
+            expired = db.execute("DELETE FROM recordings WHERE created < ?", (time.time() - self._max_age,)).rowcount
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM recordings").fetchone()[0]
+            excess = total - self._max_bytes
+            evicted = []
+            if excess > 0:
+                for row_id, size in db.execute("SELECT id, size FROM recordings ORDER BY created"):
+                    evicted.append(row_id)
+                    excess -= size
+                    if excess <= 0:
+                        break
+                db.executemany("DELETE FROM recordings WHERE id = ?", [(row_id,) for row_id in evicted])
+        if expired or evicted:
+            log.info(f"Recording archive: evicted {expired} expired and {len(evicted)} over the size limit")
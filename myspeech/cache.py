@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+def cache_key(audio_bytes: bytes, model: str, language: str) -> str:
+    """Content address of a transcription request."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(model.encode())
+    h.update(b"\0")
+    h.update(language.encode())
+    h.update(b"\0")
+    h.update(audio_bytes)
+    return h.hexdigest()
+
+
+class TranscriptionCache:
+    """Bounded LRU of transcripts keyed by audio content, model and language.
+
+    An optional disk tier keeps results across restarts as one small text file
+    per key; it is evicted oldest-first once it grows past `max_disk_bytes`.
+    """
+
+    def __init__(self, max_entries: int, disk_dir: Path | None = None, max_disk_bytes: int = 0):
+        self._max_entries = max_entries
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._disk_dir = disk_dir
+        self._max_disk_bytes = max_disk_bytes
+        self._disk: OrderedDict[str, int] = OrderedDict()  # key -> file size, oldest first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir is not None:
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        try:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            entries = []
+            with os.scandir(self._disk_dir) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".txt"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, entry.name[:-4], st.st_size))
+            for _mtime, key, size in sorted(entries):
+                self._disk[key] = size
+                self._disk_bytes += size
+            log.info(f"Transcription cache: {len(self._disk)} entries on disk ({self._disk_bytes // 1024} KB)")
+        except OSError as e:
+            log.warning(f"Disabling disk cache at {self._disk_dir}: {e}")
+            self._disk_dir = None
+
+    def _path(self, key: str) -> Path:
+        return self._disk_dir / f"{key}.txt"
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+            elif self._disk_dir is not None and key in self._disk:
+                try:
+                    text = self._path(key).read_text()
+                    os.utime(self._path(key))
+                    self._disk.move_to_end(key)
+                    self._remember(key, text)
+                except OSError:
+                    self._disk_bytes -= self._disk.pop(key)
+
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return text
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._remember(key, text)
+            if self._disk_dir is None or key in self._disk:
+                return
+            try:
+                data = text.encode()
+                self._path(key).write_bytes(data)
+                self._disk[key] = len(data)
+                self._disk_bytes += len(data)
+            except OSError as e:
+                log.debug(f"Failed to write cache entry: {e}")
+                return
+            while self._disk_bytes > self._max_disk_bytes and self._disk:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                try:
+                    self._path(old_key).unlink()
+                except OSError:
+                    pass
+
+    def _remember(self, key: str, text: str):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class CaptureBuffer:
+    """Growable int16 buffer filled by the audio callback without a lock.
+
+    Single producer, single consumer: only the audio callback calls `append`,
+    and readers only ever see the `(array, length)` pair it publishes after
+    each write. Publishing is a single attribute assignment, which is atomic
+    under the GIL. Growth moves to a new array, so views handed out earlier
+    stay valid and are never overwritten.
+    """
+
+    def __init__(self, channels: int, initial_samples: int):
+        self._data = np.empty((max(initial_samples, 1), channels), dtype=np.int16)
+        self._length = 0
+        self._published: tuple[np.ndarray, int] = (self._data, 0)
+
+    def append(self, block: np.ndarray, gain: float = 1.0):
+        """Copy a block in (producer only). Gain is applied on the way in."""
+        n = len(block)
+        end = self._length + n
+        if end > len(self._data):
+            grown = np.empty((max(end, 2 * len(self._data)), self._data.shape[1]), dtype=np.int16)
+            grown[:self._length] = self._data[:self._length]
+            self._data = grown
+
+        if gain == 1.0:
+            self._data[self._length:end] = block
+        else:
+            scaled = block.astype(np.float32) * gain
+            np.clip(scaled, -32768, 32767, out=scaled)
+            self._data[self._length:end] = scaled
+        self._length = end
+        self._published = (self._data, end)
+
+    def __len__(self) -> int:
+        return self._published[1]
+
+    def view(self, start: int = 0, end: int | None = None) -> np.ndarray:
+        """Zero-copy view of published samples [start:end]."""
+        data, length = self._published
+        return data[start:length if end is None else min(end, length)]
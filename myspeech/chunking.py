@@ -0,0 +1,65 @@
+import re
+
+import numpy as np
+
+from myspeech.vad import frame_features
+
+_FRAME_MS = 30
+_SMOOTH_FRAMES = 10  # Look for ~300 ms pauses, not the gaps between syllables
+_MAX_OVERLAP_WORDS = 6
+
+
+def chunk_bounds(
+    audio: np.ndarray, sample_rate: int, min_seconds: float = 20.0, max_seconds: float = 30.0
+) -> list[tuple[int, int]]:
+    """Split a long clip into (start, end) sample ranges of min..max seconds.
+
+    Each cut lands in the quietest stretch of its min..max window, so chunks
+    end in pauses rather than mid-word. A min_seconds at or above max_seconds
+    (possible mid-edit with hot reload) is clamped just below it.
+    """
+    frame = max(int(sample_rate * _FRAME_MS / 1000), 2)
+    rms, _ = frame_features(audio, frame)
+    total = len(audio)
+    if total <= max_seconds * sample_rate or not len(rms):
+        return [(0, total)]
+
+    kernel = np.ones(_SMOOTH_FRAMES, dtype=np.float32) / _SMOOTH_FRAMES
+    energy = np.convolve(rms, kernel, mode="same")
+    max_frames = max(int(max_seconds * 1000 / _FRAME_MS), 2)
+    min_frames = min(max(int(min_seconds * 1000 / _FRAME_MS), 1), max_frames - 1)
+
+    bounds = []
+    start = 0
+    while total - start > max_seconds * sample_rate:
+        first = start // frame + min_frames
+        window = energy[first:start // frame + max_frames]
+        if not len(window):
+            break
+        cut = (first + int(np.argmin(window))) * frame + frame // 2
+        bounds.append((start, cut))
+        start = cut
+    if start < total:
+        bounds.append((start, total))
+    return bounds
+
+
+def _words(text: str) -> list[str]:
+    return [re.sub(r"[^\w']", "", word).lower() for word in text.split()]
+
+
+def stitch(texts: list[str]) -> str:
+    """Join chunk transcripts in order, dropping words repeated across a boundary."""
+    result: list[str] = []
+    for text in texts:
+        words = text.split()
+        if not words:
+            continue
+        if result:
+            tail, head = _words(" ".join(result[-_MAX_OVERLAP_WORDS:])), _words(text)
+            for size in range(min(len(tail), len(head), _MAX_OVERLAP_WORDS), 0, -1):
+                if tail[-size:] == head[:size]:
+                    words = words[size:]
+                    break
+        result.extend(words)
+    return " ".join(result)
@@ -1,28 +1,57 @@
 import subprocess
+import threading
 import time
-
-from AppKit import NSPasteboard, NSPasteboardTypeString
+from contextlib import nullcontext
+from dataclasses import dataclass
 
 import config
+from myspeech.tracing import Trace, Tracer
 
 
 def _get_clipboard() -> str | None:
+    from AppKit import NSPasteboard, NSPasteboardTypeString
+
     pb = NSPasteboard.generalPasteboard()
     return pb.stringForType_(NSPasteboardTypeString)
 
 
 def _set_clipboard(text: str):
+    from AppKit import NSPasteboard, NSPasteboardTypeString
+
     pb = NSPasteboard.generalPasteboard()
     pb.clearContents()
     pb.setString_forType_(text, NSPasteboardTypeString)
 
 
+@dataclass
+class ClipboardState:
+    """What to return to after a dictation: the frontmost app and the clipboard text."""
+
+    app: str | None = None
+    text: str | None = None
+    inherited: bool = False  # text came from a restore this dictation cancelled
+
+
 class ClipboardManager:
-    def __init__(self):
-        self._saved_app: str | None = None
-        self._saved_clipboard_text: str | None = None
+    """Saves and restores per-dictation state, so overlapping dictations each
+    paste into and restore their own app.
+
+    The only shared state is the one pending clipboard restore. It runs on a
+    timer after the paste, is pushed back (not repeated) when another paste
+    lands first, and is taken over by a dictation that starts before it fires,
+    so the user's original clipboard is restored exactly once.
+    """
+
+    def __init__(self, tracer: Tracer | None = None):
+        self._tracer = tracer
+        self._lock = threading.Lock()
+        self._pending: threading.Timer | None = None
+        self._pending_text: str | None = None
+        self._pending_trace: Trace | None = None  # Dictation whose restore is pending; gets the "restore" span
+
+    def save(self) -> ClipboardState:
+        state = ClipboardState()
 
-    def save(self):
         # Save the frontmost application's bundle identifier
         try:
             result = subprocess.run(
@@ -31,62 +60,105 @@ class ClipboardManager:
                 text=True,
                 timeout=2,
             )
-            self._saved_app = result.stdout.strip() if result.returncode == 0 else None
+            state.app = result.stdout.strip() if result.returncode == 0 else None
         except Exception:
-            self._saved_app = None
+            state.app = None
 
         # Save current clipboard text if restore is enabled
         if config.RESTORE_CLIPBOARD:
-            try:
-                self._saved_clipboard_text = _get_clipboard()
-            except Exception:
-                self._saved_clipboard_text = None
+            with self._lock:
+                if self._pending is not None:
+                    # The clipboard still holds the last transcription: take over its restore
+                    self._pending.cancel()
+                    state.text, state.inherited = self._pending_text, True
+                    self._pending = self._pending_text = self._pending_trace = None
+                else:
+                    try:
+                        state.text = _get_clipboard()
+                    except Exception:
+                        state.text = None
+        return state
 
-    def set_and_paste(self, text: str) -> bool:
+    def set_and_paste(self, text: str, state: ClipboardState, trace: Trace | None = None) -> bool:
+        pasted = True
         try:
-            _set_clipboard(text)
-
-            # Restore focus to original app and paste
-            if self._saved_app:
-                # Activate the app using bundle identifier and paste
-                script = f'''
-                    tell application id "{self._saved_app}" to activate
-                    delay {config.PASTE_DELAY}
-                    tell application "System Events" to keystroke "v" using command down
-                '''
-                subprocess.run(
-                    ["osascript", "-e", script],
-                    capture_output=True,
-                    timeout=3,
-                )
+            with trace.span("paste") if trace else nullcontext():
+                _set_clipboard(text)
 
-            # Restore previous clipboard content after a delay
-            # (allows clipboard history apps to capture the transcription)
-            if config.RESTORE_CLIPBOARD and self._saved_clipboard_text is not None:
-                try:
-                    time.sleep(config.RESTORE_DELAY)
-                    _set_clipboard(self._saved_clipboard_text)
-                except Exception:
-                    pass
-            self._saved_clipboard_text = None
-
-            self._saved_app = None
-            return True
+                # Restore focus to original app and paste
+                if state.app:
+                    # Activate the app using bundle identifier and paste
+                    script = f'''
+                        tell application id "{state.app}" to activate
+                        delay {config.PASTE_DELAY}
+                        tell application "System Events" to keystroke "v" using command down
+                    '''
+                    subprocess.run(
+                        ["osascript", "-e", script],
+                        capture_output=True,
+                        timeout=3,
+                    )
         except Exception:
-            self._saved_app = None
-            self._saved_clipboard_text = None
-            return False
+            pasted = False
 
-    def restore(self):
+        # Restore previous clipboard content after a delay
+        # (allows clipboard history apps to capture the transcription).
+        # Also after a failed paste: the text may be an inherited restore,
+        # the user's only copy of their original clipboard.
+        if config.RESTORE_CLIPBOARD and state.text is not None:
+            self._schedule_restore(state.text, trace)
+        return pasted
+
+    def restore(self, state: ClipboardState, trace: Trace | None = None):
+        # Hand back a restore this dictation took over but won't replace with a paste
+        if state.inherited and state.text is not None:
+            self._schedule_restore(state.text, trace)
         # Just restore focus without pasting (used when no transcription)
-        if self._saved_app:
+        if state.app:
             try:
                 subprocess.run(
-                    ["osascript", "-e", f'tell application id "{self._saved_app}" to activate'],
+                    ["osascript", "-e", f'tell application id "{state.app}" to activate'],
                     capture_output=True,
                     timeout=2,
                 )
             except Exception:
                 pass
-        self._saved_app = None
-        self._saved_clipboard_text = None
+
+    def flush(self):
+        """Restore a pending clipboard now (on quit)."""
+        with self._lock:
+            if self._pending is None:
+                return
+            self._pending.cancel()
+            self._pending = None
+            self._restore_locked()
+
+    def _schedule_restore(self, text: str, trace: Trace | None = None):
+        with self._lock:
+            if self._pending is not None:
+                # Merge with the pending restore: keep the older original, restart the delay
+                self._pending.cancel()
+                text = self._pending_text
+            self._pending_text = text
+            self._pending_trace = trace
+            self._pending = threading.Timer(config.RESTORE_DELAY, self._on_restore_timer)
+            self._pending.daemon = True
+            self._pending.start()
+
+    def _on_restore_timer(self):
+        with self._lock:
+            # A timer cancelled while waiting for the lock must not restore
+            if self._pending is not threading.current_thread():
+                return
+            self._pending = None
+            self._restore_locked()
+
+    def _restore_locked(self):
+        start = time.monotonic()
+        try:
+            _set_clipboard(self._pending_text)
+        except Exception:
+            pass
+        if self._tracer and self._pending_trace:
+            self._tracer.record_late(self._pending_trace, "restore", start, time.monotonic())
+        self._pending_text = self._pending_trace = None
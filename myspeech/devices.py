@@ -0,0 +1,146 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import sounddevice as sd
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class InputDevice:
+    index: int
+    name: str
+    channels: int  # Maximum input channels
+    sample_rate: float  # Default (native) sample rate
+
+    @property
+    def label(self) -> str:
+        return f"[{self.index}] {self.name}"
+
+
+class DeviceSnapshot:
+    """Input devices as PortAudio listed them at one refresh, indexed by index and name."""
+
+    def __init__(self, devices: Iterable[InputDevice] = (), default_index: int | None = None):
+        self.devices = tuple(devices)
+        self.default_index = default_index
+        self.by_index = {device.index: device for device in self.devices}
+        self.by_name: dict[str, InputDevice] = {}
+        for device in self.devices:
+            self.by_name.setdefault(device.name, device)
+
+    @property
+    def default(self) -> InputDevice | None:
+        return self.by_index.get(self.default_index)
+
+    def get(self, index: int | None) -> InputDevice | None:
+        """The device at `index`, or the default device for None."""
+        return self.default if index is None else self.by_index.get(index)
+
+
+@dataclass(frozen=True)
+class DeviceChange:
+    added: tuple[InputDevice, ...]  # New devices, or known ones at a new index
+    removed: tuple[InputDevice, ...]
+    snapshot: DeviceSnapshot
+
+
+def _scan() -> DeviceSnapshot:
+    devices = [
+        InputDevice(i, d['name'], int(d['max_input_channels']), float(d['default_samplerate']))
+        for i, d in enumerate(sd.query_devices())
+        if d['max_input_channels'] > 0
+    ]
+    default = sd.default.device[0]
+    return DeviceSnapshot(devices, default if default is not None and default >= 0 else None)
+
+
+class DeviceRegistry:
+    """Cached input device list, refreshed in the background.
+
+    PortAudio only notices hot-plugged devices after it is re-initialised,
+    which would tear down an open stream. Background refreshes therefore
+    re-initialise only while `can_reinitialize()` reports no open stream,
+    holding `lock`, which Recorder takes around opening and closing
+    streams. Readers (the menu, Recorder) use the last snapshot and never
+    touch PortAudio themselves. Subscribers get a DeviceChange whenever
+    devices appear, disappear or move to another index.
+    """
+
+    def __init__(self, interval: float, can_reinitialize: Callable[[], bool] = lambda: True):
+        self.lock = threading.Lock()
+        self._interval = interval
+        self._can_reinitialize = can_reinitialize
+        self._snapshot: DeviceSnapshot | None = None
+        self._subscribers: list[Callable[[DeviceChange], None]] = []
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def snapshot(self) -> DeviceSnapshot:
+        snapshot = self._snapshot
+        return snapshot if snapshot is not None else self.refresh()
+
+    def subscribe(self, callback: Callable[[DeviceChange], None]):
+        self._subscribers.append(callback)
+
+    def refresh(self, reinitialize: bool = False) -> DeviceSnapshot:
+        """Rescan input devices and notify subscribers of changes.
+
+        With reinitialize, PortAudio is restarted first so hot-plugged
+        devices show up, unless a stream is open.
+        """
+        with self.lock:
+            if reinitialize and self._can_reinitialize():
+                sd._terminate()
+                sd._initialize()
+            snapshot = _scan()
+            previous, self._snapshot = self._snapshot, snapshot
+        if previous is not None:
+            self._publish(previous, snapshot)
+        return snapshot
+
+    def request_refresh(self):
+        """Refresh soon on the background thread; returns immediately."""
+        self._wake.set()
+
+    def _publish(self, previous: DeviceSnapshot, snapshot: DeviceSnapshot):
+        before = {(device.index, device.name) for device in previous.devices}
+        after = {(device.index, device.name) for device in snapshot.devices}
+        added = tuple(device for device in snapshot.devices if (device.index, device.name) not in before)
+        removed = tuple(device for device in previous.devices if (device.index, device.name) not in after)
+        if not added and not removed:
+            return
+        log.info(
+            "Audio devices changed: "
+            + ", ".join([f"+{device.label}" for device in added] + [f"-{device.label}" for device in removed])
+        )
+        change = DeviceChange(added, removed, snapshot)
+        for callback in list(self._subscribers):
+            try:
+                callback(change)
+            except Exception as e:
+                log.warning(f"Device change subscriber failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="device-registry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self._interval if self._interval > 0 else None)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.refresh(reinitialize=True)
+            except Exception as e:
+                log.debug(f"Audio device refresh failed: {e}")
@@ -0,0 +1,206 @@
+import io
+import logging
+import struct
+import threading
+
+import numpy as np
+
+import config
+from myspeech.capture import CaptureBuffer
+from myspeech.vad import speech_frames
+
+log = logging.getLogger(__name__)
+
+FORMATS = ("wav", "flac")
+
+_FRAME_MS = 30
+
+
+def wav_header(num_samples: int, channels: int, sample_rate: int) -> bytes:
+    """Build a 44-byte PCM WAV header for 16-bit samples."""
+    data_size = num_samples * channels * 2  # 16-bit = 2 bytes
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * channels * 2, channels * 2, 16,
+        b"data", data_size,
+    )
+
+
+def encode_wav(audio_data: np.ndarray) -> bytes:
+    """Wrap int16 samples in a WAV container.
+
+    The samples are read through a memoryview, so the join is the only copy.
+    """
+    audio_data = np.ascontiguousarray(audio_data)
+    header = wav_header(len(audio_data), config.CHANNELS, config.SAMPLE_RATE)
+    return b"".join((header, memoryview(audio_data).cast("B")))
+
+
+def audio_format(audio_bytes: bytes) -> str:
+    """Detect the container of an encoded payload from its magic bytes."""
+    return "flac" if audio_bytes[:4] == b"fLaC" else "wav"
+
+
+def audio_duration(audio_bytes: bytes) -> float | None:
+    """Seconds of audio in a WAV or FLAC payload, read from its header."""
+    try:
+        if audio_bytes[:4] == b"fLaC":
+            # STREAMINFO: 20-bit sample rate, 3-bit channels, 5-bit depth, 36-bit sample count
+            (packed,) = struct.unpack_from(">Q", audio_bytes, 18)
+            sample_rate = packed >> 44
+            total_samples = packed & ((1 << 36) - 1)
+            return total_samples / sample_rate if sample_rate and total_samples else None
+        if audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE":
+            (byte_rate,) = struct.unpack_from("<I", audio_bytes, 28)
+            offset = 12
+            while offset + 8 <= len(audio_bytes):
+                chunk_id, size = struct.unpack_from("<4sI", audio_bytes, offset)
+                if chunk_id == b"data":
+                    return size / byte_rate if byte_rate else None
+                offset += 8 + size + (size & 1)
+    except struct.error:
+        pass
+    return None
+
+
+def _open_flac(buffer: io.BytesIO):
+    import soundfile as sf
+    return sf.SoundFile(
+        buffer,
+        mode="w",
+        samplerate=config.SAMPLE_RATE,
+        channels=config.CHANNELS,
+        format="FLAC",
+        subtype="PCM_16",
+    )
+
+
+def encode_flac(audio_data: np.ndarray) -> bytes:
+    """Encode int16 samples as FLAC in one pass."""
+    buffer = io.BytesIO()
+    with _open_flac(buffer) as f:
+        f.write(audio_data)
+    return buffer.getvalue()
+
+
+def decode(audio_bytes: bytes) -> np.ndarray:
+    """(samples, channels) int16 from a payload made by encode_wav or encode_flac."""
+    if audio_format(audio_bytes) == "wav":
+        # Our WAVs are a 44-byte header followed by int16 samples
+        return np.frombuffer(audio_bytes, dtype=np.int16, offset=44).reshape(-1, config.CHANNELS)
+    import soundfile as sf
+    samples, _ = sf.read(io.BytesIO(audio_bytes), dtype="int16", always_2d=True)
+    return samples
+
+
+def encode(audio_data: np.ndarray, fmt: str) -> bytes:
+    return encode_flac(audio_data) if fmt == "flac" else encode_wav(audio_data)
+
+
+def transcode(audio_bytes: bytes, fmt: str) -> bytes:
+    """Re-encode a WAV or FLAC payload as `fmt` (no-op if it already is)."""
+    if audio_format(audio_bytes) == fmt:
+        return audio_bytes
+    return encode(decode(audio_bytes), fmt)
+
+
+def flac_available() -> bool:
+    try:
+        import soundfile  # noqa: F401
+        return True
+    except (ImportError, OSError) as e:
+        log.warning(f"FLAC encoding unavailable, falling back to WAV: {e}")
+        return False
+
+
+class IncrementalEncoder:
+    """Compresses a CaptureBuffer to FLAC in the background while it is being filled.
+
+    A consumer of the lock-free capture buffer: every `interval` seconds it
+    encodes whatever the audio callback has published since the last pass, so
+    by the time the hotkey is released only the last fraction of a second is
+    left to encode.
+
+    With `vad` set, encoding starts at the first speech frame (fixed
+    threshold, no noise floor) and trailing silence is held back until
+    speech resumes. That is only a guess at the stop-time VAD trim, which
+    also adapts to the clip's noise floor: finish() checks the guess against
+    the final bounds and returns None when they differ.
+    """
+
+    def __init__(self, capture: CaptureBuffer, vad: bool, interval: float = 0.25):
+        self._capture = capture
+        self._vad = vad
+        self._interval = interval
+        self._frame_samples = int(config.SAMPLE_RATE * _FRAME_MS / 1000)
+        self._padding = int(config.VAD_PADDING * config.SAMPLE_RATE)
+        self._buffer = io.BytesIO()
+        self._file = _open_flac(self._buffer)
+        self._start: int | None = None if vad else 0
+        self._position = 0  # Samples encoded so far (absolute offset in the capture)
+        self._scanned = 0  # Samples already checked for speech
+        self._error: Exception | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _encode_until(self, end: int):
+        if end > self._position:
+            self._file.write(self._capture.view(self._position, end))
+            self._position = end
+
+    def _pass(self):
+        available = len(self._capture)
+        if not self._vad:
+            self._encode_until(available)
+            return
+
+        chunk = self._capture.view(self._scanned, available)
+        voiced = speech_frames(chunk, config.SAMPLE_RATE, frame_ms=_FRAME_MS, min_rms=config.VAD_MIN_RMS, noise_ratio=0.0)
+        indices = np.flatnonzero(voiced)
+        if len(indices):
+            if self._start is None:
+                self._start = max(self._scanned + int(indices[0]) * self._frame_samples - self._padding, 0)
+                self._position = self._start
+            speech_end = self._scanned + (int(indices[-1]) + 1) * self._frame_samples
+            self._encode_until(min(speech_end + self._padding, available))
+        self._scanned += len(voiced) * self._frame_samples
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self._pass()
+            except Exception as e:
+                log.warning(f"Incremental encoding failed: {e}")
+                self._error = e
+                return
+
+    def finish(self, start: int, end: int) -> bytes | None:
+        """Encode the remaining samples up to `end` and return the FLAC payload of [start, end).
+
+        Returns None if encoding failed or the samples encoded so far don't
+        begin at `start` or already run past `end`; the caller should then
+        encode the clip in one pass.
+        """
+        self._stop.set()
+        self._thread.join()
+        if self._error is not None or self._start != start or self._position > end:
+            if self._error is None and self._start is not None:
+                log.info(
+                    f"FLAC: encoded range {self._start}-{self._position} doesn't match VAD bounds {start}-{end}, re-encoding"
+                )
+            self.cancel()
+            return None
+        self._encode_until(end)
+        self._file.close()
+        log.info(f"FLAC: encoded {(self._position - self._start) / config.SAMPLE_RATE:.2f}s during capture")
+        return self._buffer.getvalue()
+
+    def cancel(self):
+        self._stop.set()
+        self._thread.join()
+        try:
+            self._file.close()
+        except Exception:
+            pass
@@ -0,0 +1,193 @@
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Mapping
+
+log = logging.getLogger(__name__)
+
+_PRIOR_LATENCY = 1.0  # Assumed seconds per request before an endpoint has answered
+_ERROR_HALF_LIFE = 60.0  # Seconds for a burst of errors to be half forgotten
+_MIN_SAMPLES = 5  # Latency samples needed before trusting the percentile
+
+
+class Endpoint:
+    """One transcription server, its client and its recent health."""
+
+    def __init__(self, url: str, audio_format: str, client: Any, close: Callable[[], None], window: int = 50):
+        self.url = url
+        self.format = audio_format
+        self.client = client
+        self._close = close
+        self._latency: deque[float] = deque(maxlen=window)
+        self._errors = 0.0  # Decaying error rate, 0..1
+        self._last_error = 0.0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _error_rate(self, now: float) -> float:
+        return self._errors * 0.5 ** ((now - self._last_error) / _ERROR_HALF_LIFE)
+
+    def begin(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def end(self, elapsed: float | None):
+        """Record a finished request; elapsed is None for a failure."""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            errors = self._error_rate(now)
+            if elapsed is None:
+                self._errors, self._last_error = errors * 0.8 + 0.2, now
+            else:
+                self._errors, self._last_error = errors * 0.8, now
+                self._latency.append(elapsed)
+
+    def score(self) -> float:
+        """Expected seconds for the next request; lower is better."""
+        with self._lock:
+            latency = statistics.median(self._latency) if self._latency else _PRIOR_LATENCY
+            errors = self._error_rate(time.monotonic())
+            in_flight = self._in_flight
+        return latency * (1 + in_flight) / max(1.0 - errors, 0.05)
+
+    def hedge_delay(self, percentile: float, min_delay: float) -> float:
+        """How long to wait for this endpoint before sending a duplicate elsewhere."""
+        with self._lock:
+            samples = sorted(self._latency)
+        if len(samples) < _MIN_SAMPLES:
+            estimate = 2 * (statistics.median(samples) if samples else _PRIOR_LATENCY)
+        else:
+            estimate = samples[min(int(len(samples) * percentile / 100), len(samples) - 1)]
+        return max(estimate, min_delay)
+
+    def close(self):
+        self._close()
+
+
+def parse_endpoints(primary_url: str, primary_format: str, extra: Iterable) -> list[tuple[str, str]]:
+    """(url, format) for the primary server plus [endpoints] extra entries (URLs or tables)."""
+    specs = [(primary_url, primary_format)]
+    for entry in extra or ():
+        if isinstance(entry, str):
+            specs.append((entry, primary_format))
+        elif isinstance(entry, Mapping) and entry.get("url"):
+            specs.append((str(entry["url"]), str(entry.get("format", primary_format))))
+        else:
+            log.warning(f"Ignoring invalid endpoint {entry!r}")
+    return specs
+
+
+class EndpointPool:
+    """Sends each request to the healthiest endpoint, with failover and hedging.
+
+    If the chosen endpoint fails, the next one is tried immediately. If it
+    hasn't answered by its p95 latency (the hedge deadline), a duplicate goes
+    to the next-best endpoint and whichever succeeds first wins; the loser
+    still finishes in the background so its timing counts toward its health.
+
+    Callers hold the pool with acquire()/release() around run(). A pool
+    replaced after a config change is retire()d: it closes once the last
+    caller and background request are done, not under their feet.
+    """
+
+    def __init__(self, endpoints: list[Endpoint], hedge: bool = True, percentile: float = 95, min_delay: float = 0.3):
+        self.endpoints = endpoints
+        self._hedge = hedge
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(endpoints), thread_name_prefix="endpoint")
+        self._users = 0  # Callers in run() plus requests still in flight
+        self._retired = False
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            close = self._retired and self._users == 0
+        if close:
+            self.close()
+
+    def retire(self):
+        """Close once nothing is using the pool any more."""
+        with self._lock:
+            self._retired = True
+            close = self._users == 0
+        if close:
+            self.close()
+
+    def ranked(self) -> list[Endpoint]:
+        # sorted() is stable, so ties keep the configured order (primary first)
+        return sorted(self.endpoints, key=lambda endpoint: endpoint.score())
+
+    def _call_held(self, endpoint: Endpoint, request: Callable[[Endpoint], Any]) -> tuple[bool, Any]:
+        # Acquired when submitted, so a hedged loser keeps a retired pool open until it finishes
+        try:
+            return self._call(endpoint, request)
+        finally:
+            self.release()
+
+    def _call(self, endpoint: Endpoint, request: Callable[[Endpoint], Any]) -> tuple[bool, Any]:
+        start = time.monotonic()
+        try:
+            result = request(endpoint)
+        except Exception as e:
+            endpoint.end(None)
+            log.warning(f"Transcription via {endpoint.url} failed: {e}")
+            return False, None
+        endpoint.end(time.monotonic() - start)
+        return True, result
+
+    def run(self, request: Callable[[Endpoint], Any]) -> Any:
+        """Return the first successful `request(endpoint)` result, or None if all failed."""
+        candidates = iter(self.ranked())
+        pending: dict[Future, Endpoint] = {}
+
+        def launch() -> Endpoint | None:
+            endpoint = next(candidates, None)
+            if endpoint is not None:
+                endpoint.begin()
+                self.acquire()
+                pending[self._executor.submit(self._call_held, endpoint, request)] = endpoint
+            return endpoint
+
+        if len(self.endpoints) == 1:
+            # Nothing to hedge or fail over to: run on the caller's thread
+            endpoint = self.endpoints[0]
+            endpoint.begin()
+            return self._call(endpoint, request)[1]
+
+        start = time.monotonic()
+        first = launch()
+        deadline = start + first.hedge_delay(self._percentile, self._min_delay) if self._hedge else None
+        while pending:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                deadline = None
+                endpoint = launch()
+                if endpoint is not None:
+                    log.info(f"{first.url} slow after {time.monotonic() - start:.2f}s, hedging to {endpoint.url}")
+                continue
+            for future in done:
+                endpoint = pending.pop(future)
+                ok, result = future.result()
+                if ok:
+                    if endpoint is not first:
+                        log.info(f"Answered by {endpoint.url} in {time.monotonic() - start:.2f}s")
+                    return result
+            if not pending:
+                launch()  # Everything in flight failed: fail over to the next endpoint
+        return None
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.close()
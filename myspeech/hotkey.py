@@ -1,6 +1,7 @@
 import ctypes
 import ctypes.util
 import logging
+import queue
 import threading
 import time
 from typing import Callable
@@ -9,6 +10,8 @@ import Quartz
 from pynput import keyboard
 
 import config
+from myspeech import hotkey_state, user_config
+from myspeech.hotkey_state import HotkeyBindings, HotkeyState
 
 log = logging.getLogger(__name__)
 
@@ -190,135 +193,108 @@ class HotkeyListener:
         self._on_record_stop = on_record_stop
         self._on_keys_released = on_keys_released
         self._on_open_recording = on_open_recording
-        self._pressed_modifiers: set[str] = set()
-        self._pressed_key_codes: set[int] = set()
-        self._hotkey_active = False
-        self._waiting_for_release = False  # Track if we're waiting for all keys to be released
-        self._last_record_end: float = 0
-        self._lock = threading.Lock()
+        # Swapped whole on every transition; only the listener thread writes it
+        self._state = HotkeyState()
+        self.detected_at: float = 0  # Monotonic time the record hotkey was last detected
         self._listener: keyboard.Listener | None = None
+        # Callbacks run in order on one dispatcher thread instead of a thread per key event
+        self._callbacks: queue.SimpleQueue[Callable[[], None] | None] = queue.SimpleQueue()
+        self._dispatcher: threading.Thread | None = None
         self._has_accessibility = False  # Track if we have accessibility permissions
 
-        # Parse modifiers from config string
-        self._required_modifiers = _parse_modifiers(config.HOTKEY_MODIFIERS)
-
         # Build VK -> char mapping at startup using keyboard layout
         self._vk_to_char = _build_vk_to_char_map()
+        self._configure_keys()
+        user_config.subscribe(self._on_config_changed)
+
+    def _on_config_changed(self, changed: set[tuple[str, str]]):
+        if any(section == "hotkey" for section, _key in changed):
+            self._configure_keys()
 
+    def _configure_keys(self):
         # Build reverse mapping (char -> VK) for configured hotkeys
         char_to_vk = {v: k for k, v in self._vk_to_char.items()}
-        self._record_key_vk = char_to_vk.get(config.HOTKEY_KEY.lower())
-        self._open_key_vk = char_to_vk.get(config.HOTKEY_OPEN_RECORDING_KEY.lower())
+        record_key_vk = char_to_vk.get(config.HOTKEY_KEY.lower())
+        open_key_vk = char_to_vk.get(config.HOTKEY_OPEN_RECORDING_KEY.lower())
 
-        if self._record_key_vk is not None:
-            log.info(f"Record hotkey: VK {self._record_key_vk} for '{config.HOTKEY_KEY}'")
+        if record_key_vk is not None:
+            log.info(f"Record hotkey: VK {record_key_vk} for '{config.HOTKEY_KEY}'")
         else:
             log.warning(f"Could not find VK code for record key '{config.HOTKEY_KEY}'")
 
-        if self._open_key_vk is not None:
-            log.info(f"Open recording hotkey: VK {self._open_key_vk} for '{config.HOTKEY_OPEN_RECORDING_KEY}'")
+        if open_key_vk is not None:
+            log.info(f"Open recording hotkey: VK {open_key_vk} for '{config.HOTKEY_OPEN_RECORDING_KEY}'")
         else:
             log.warning(f"Could not find VK code for open recording key '{config.HOTKEY_OPEN_RECORDING_KEY}'")
 
-    def _get_modifier(self, key) -> str | None:
-        return self._MODIFIER_MAP.get(key)
+        # A single attribute swap, so the event threads never see a half-updated config
+        self._bindings = HotkeyBindings.create(
+            frozenset(_parse_modifiers(config.HOTKEY_MODIFIERS)),
+            record_key_vk,
+            open_key_vk,
+            config.HOTKEY_DEBOUNCE_SECONDS,
+        )
 
     def _get_key_code(self, key) -> int | None:
         # Get the virtual key code (layout-independent)
-        if hasattr(key, 'vk') and key.vk is not None:
-            return key.vk
-        return None
-
-    def _check_modifiers(self) -> bool:
-        return self._required_modifiers <= self._pressed_modifiers
-
-    def _check_record_hotkey(self) -> bool:
-        if self._record_key_vk is None:
-            return False
-        return self._check_modifiers() and self._record_key_vk in self._pressed_key_codes
+        return getattr(key, "vk", None)
 
-    def _check_open_recording_hotkey(self) -> bool:
-        if self._open_key_vk is None:
-            return False
-        return self._check_modifiers() and self._open_key_vk in self._pressed_key_codes
-
-    def _all_hotkey_keys_released(self) -> bool:
-        """Check if all hotkey keys (modifiers + main key) are released."""
-        # Check if main key is still pressed
-        if self._record_key_vk is not None and self._record_key_vk in self._pressed_key_codes:
-            return False
-        # Check if any required modifier is still pressed
-        for mod in self._required_modifiers:
-            if mod in self._pressed_modifiers:
-                return False
-        return True
+    def _dispatch(self, callback: Callable[[], None]):
+        self._callbacks.put(callback)
 
-    def _on_press(self, key):
-        modifier = self._get_modifier(key)
-        key_code = self._get_key_code(key)
-
-        with self._lock:
-            if modifier:
-                self._pressed_modifiers.add(modifier)
-            if key_code is not None:
-                self._pressed_key_codes.add(key_code)
-
-            # Check open recording hotkey first (single press, not hold)
-            if self._on_open_recording and self._check_open_recording_hotkey():
-                threading.Thread(target=self._on_open_recording, daemon=True).start()
-                return
-
-            # Debounce: ignore if too soon after last recording
-            if time.time() - self._last_record_end < config.HOTKEY_DEBOUNCE_SECONDS:
+    def _dispatch_loop(self):
+        while True:
+            callback = self._callbacks.get()
+            if callback is None:
                 return
+            try:
+                callback()
+            except Exception as e:
+                log.error(f"Hotkey callback failed: {e}")
 
-            if not self._hotkey_active and self._check_record_hotkey():
+    def _run_actions(self, actions: tuple[str, ...], now: float):
+        for action in actions:
+            if action == hotkey_state.RECORD_START:
                 log.info("Record hotkey detected")
-                self._hotkey_active = True
-                threading.Thread(target=self._on_record_start, daemon=True).start()
+                self.detected_at = now
+                self._dispatch(self._on_record_start)
+            elif action == hotkey_state.RECORD_STOP:
+                self._dispatch(self._on_record_stop)
+            elif action == hotkey_state.KEYS_RELEASED and self._on_keys_released:
+                self._dispatch(self._on_keys_released)
+            elif action == hotkey_state.OPEN_RECORDING and self._on_open_recording:
+                self._dispatch(self._on_open_recording)
+
+    def _on_press(self, key):
+        now = time.monotonic()
+        self._state, actions = hotkey_state.press(
+            self._state, self._bindings, self._MODIFIER_MAP.get(key), self._get_key_code(key), now
+        )
+        if actions:
+            self._run_actions(actions, now)
 
     def _on_release(self, key):
-        modifier = self._get_modifier(key)
-        key_code = self._get_key_code(key)
-
-        with self._lock:
-            if modifier:
-                self._pressed_modifiers.discard(modifier)
-            if key_code is not None:
-                self._pressed_key_codes.discard(key_code)
-
-            # Stop recording when hotkey is broken, but wait for all keys to be released
-            if self._hotkey_active and not self._check_record_hotkey():
-                self._hotkey_active = False
-                self._waiting_for_release = True
-                self._last_record_end = time.time()
-                threading.Thread(target=self._on_record_stop, daemon=True).start()
-
-            # Notify when all hotkey keys are released
-            if self._waiting_for_release and self._all_hotkey_keys_released():
-                self._waiting_for_release = False
-                if self._on_keys_released:
-                    threading.Thread(target=self._on_keys_released, daemon=True).start()
+        now = time.monotonic()
+        self._state, actions = hotkey_state.release(
+            self._state, self._bindings, self._MODIFIER_MAP.get(key), self._get_key_code(key), now
+        )
+        if actions:
+            self._run_actions(actions, now)
 
     def _create_darwin_intercept(self):
         """Create callback to suppress hotkey keys at system level."""
         def darwin_intercept(event_type, event):
+            # Runs for every keystroke system-wide: plain attribute reads, no lock
+            state = self._state
+            if not state.suppressing:
+                return event
             try:
                 key_code = Quartz.CGEventGetIntegerValueField(
                     event, Quartz.kCGKeyboardEventKeycode
                 )
-
                 # Suppress hotkey keys while our hotkey is active or waiting for release
-                with self._lock:
-                    if self._hotkey_active or self._waiting_for_release:
-                        suppress_keys = set()
-                        if self._record_key_vk is not None:
-                            suppress_keys.add(self._record_key_vk)
-                        if self._open_key_vk is not None:
-                            suppress_keys.add(self._open_key_vk)
-                        if key_code in suppress_keys:
-                            return None  # Suppress
-
+                if hotkey_state.should_suppress(state, self._bindings, key_code):
+                    return None
                 return event  # Pass through
             except Exception as e:
                 # On any error, pass through the event to prevent system hang
@@ -328,6 +304,9 @@ class HotkeyListener:
         return darwin_intercept
 
     def start(self):
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="hotkey-dispatcher", daemon=True)
+        self._dispatcher.start()
+
         # Check accessibility permissions before starting
         self._has_accessibility = check_accessibility_permissions()
 
@@ -358,3 +337,6 @@ class HotkeyListener:
         if self._listener:
             self._listener.stop()
             self._listener = None
+        if self._dispatcher:
+            self._callbacks.put(None)
+            self._dispatcher = None
@@ -0,0 +1,100 @@
+"""Pure hotkey state machine.
+
+Each key event maps an immutable HotkeyState to a new one (or the same object
+when nothing relevant changed) plus the actions to dispatch. Nothing here
+blocks, locks or imports pynput/Quartz, so the listener thread can swap
+states without a lock and scripts/bench_hotkey.py can replay events anywhere.
+"""
+
+from dataclasses import dataclass, replace
+
+RECORD_START = "record_start"
+RECORD_STOP = "record_stop"
+KEYS_RELEASED = "keys_released"
+OPEN_RECORDING = "open_recording"
+
+_NO_ACTIONS: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class HotkeyBindings:
+    """Configured hotkeys, precomputed once per config change."""
+
+    modifiers: frozenset[str]
+    record_vk: int | None
+    open_vk: int | None
+    debounce: float
+    tracked_vks: frozenset[int]  # Keys the state machine follows (and suppresses while active)
+
+    @classmethod
+    def create(cls, modifiers: frozenset[str], record_vk: int | None, open_vk: int | None, debounce: float):
+        tracked = frozenset(vk for vk in (record_vk, open_vk) if vk is not None)
+        return cls(modifiers, record_vk, open_vk, debounce, tracked)
+
+
+@dataclass(frozen=True, slots=True)
+class HotkeyState:
+    modifiers: frozenset[str] = frozenset()  # Pressed modifiers that are part of the hotkey
+    keys: frozenset[int] = frozenset()  # Pressed keys that are part of a hotkey
+    active: bool = False  # Record hotkey held
+    waiting_for_release: bool = False  # Recording stopped, hotkey keys not all released yet
+    last_record_end: float = float("-inf")  # Monotonic time the last recording stopped
+
+    @property
+    def suppressing(self) -> bool:
+        return self.active or self.waiting_for_release
+
+
+def _holds(state: HotkeyState, bindings: HotkeyBindings, vk: int | None) -> bool:
+    return vk is not None and vk in state.keys and bindings.modifiers <= state.modifiers
+
+
+def press(
+    state: HotkeyState, bindings: HotkeyBindings, modifier: str | None, key_code: int | None, now: float
+) -> tuple[HotkeyState, tuple[str, ...]]:
+    if modifier in bindings.modifiers and modifier not in state.modifiers:
+        state = replace(state, modifiers=state.modifiers | {modifier})
+    elif key_code in bindings.tracked_vks and key_code not in state.keys:
+        state = replace(state, keys=state.keys | {key_code})
+    else:
+        return state, _NO_ACTIONS  # Ordinary typing: no allocation, no checks
+
+    # Check open recording hotkey first (single press, not hold)
+    if _holds(state, bindings, bindings.open_vk):
+        return state, (OPEN_RECORDING,)
+
+    # Debounce: ignore if too soon after last recording
+    if now - state.last_record_end < bindings.debounce:
+        return state, _NO_ACTIONS
+
+    if not state.active and _holds(state, bindings, bindings.record_vk):
+        return replace(state, active=True), (RECORD_START,)
+    return state, _NO_ACTIONS
+
+
+def release(
+    state: HotkeyState, bindings: HotkeyBindings, modifier: str | None, key_code: int | None, now: float
+) -> tuple[HotkeyState, tuple[str, ...]]:
+    if modifier in state.modifiers:
+        state = replace(state, modifiers=state.modifiers - {modifier})
+    elif key_code in state.keys:
+        state = replace(state, keys=state.keys - {key_code})
+    else:
+        return state, _NO_ACTIONS
+
+    actions = _NO_ACTIONS
+    # Stop recording when hotkey is broken, but wait for all keys to be released
+    if state.active and not _holds(state, bindings, bindings.record_vk):
+        state = replace(state, active=False, waiting_for_release=True, last_record_end=now)
+        actions = (RECORD_STOP,)
+
+    # Notify when all hotkey keys are released
+    if state.waiting_for_release and bindings.record_vk not in state.keys and not (bindings.modifiers & state.modifiers):
+        state = replace(state, waiting_for_release=False)
+        actions += (KEYS_RELEASED,)
+    return state, actions
+
+
+def should_suppress(state: HotkeyState, bindings: HotkeyBindings, key_code: int) -> bool:
+    """Whether to swallow a key event so hotkey keys don't leak into the focused app."""
+    return state.suppressing and key_code in bindings.tracked_vks
@@ -3,7 +3,6 @@ import subprocess
 from pathlib import Path
 
 import config
-from myspeech.recorder import get_input_devices, get_default_input_device
 
 log = logging.getLogger(__name__)
 
@@ -72,6 +71,14 @@ def _build_submenu(title, choices, action, delegate, current_value, NSMenu, NSMe
     return parent, items
 
 
+def _device_choices(snapshot):
+    """Audio Input menu choices: (tag, value, label) for the default entry plus each input device."""
+    default = snapshot.default
+    choices = [(-1, None, f"Default ({default.name if default else 'System Default'})")]
+    choices += [(device.index, device.index, device.label) for device in snapshot.devices]
+    return choices
+
+
 def _update_submenu_checkmarks(menu_items, selected_value, NSOnState, NSOffState):
     """Update checkmarks in a submenu, checking the item matching selected_value."""
     for _tag, value, item in menu_items:
@@ -136,18 +143,14 @@ class MenuBar:
                         return
                     try:
                         from AppKit import NSMenuItem, NSOnState, NSOffState
-                        import sounddevice as sd
-                        sd._terminate()
-                        sd._initialize()
 
-                        default_idx = get_default_input_device()
-                        devices = get_input_devices()
-                        default_name = next((name for idx, name in devices if idx == default_idx), "System Default")
+                        # Cached list; PortAudio is never touched here so capture isn't disturbed.
+                        # A background rescan picks up newly plugged devices for the next open.
+                        devices = self.menubar._app._devices
+                        choices = _device_choices(devices.snapshot)
+                        devices.request_refresh()
                         current = self.menubar._current_device
 
-                        choices = [(-1, None, f"Default ({default_name})")]
-                        choices += [(idx, idx, f"[{idx}] {name}") for idx, name in devices]
-
                         _audio_submenu.removeAllItems()
                         items = []
                         for tag, value, label in choices:
@@ -219,15 +222,11 @@ class MenuBar:
             menu.addItem_(NSMenuItem.separatorItem())
 
             # Audio input submenu
-            default_idx = get_default_input_device()
-            devices = get_input_devices()
-            default_name = next((name for idx, name in devices if idx == default_idx), "System Default")
             configured_device = config.AUDIO_DEVICE
             self._current_device = configured_device
 
             # Build choices: default (-1, None) + all devices
-            audio_choices = [(-1, None, f"Default ({default_name})")]
-            audio_choices += [(idx, idx, f"[{idx}] {name}") for idx, name in devices]
+            audio_choices = _device_choices(self._app._devices.snapshot)
 
             audio_parent, _audio_menu_items = _build_submenu(
                 "Audio Input", audio_choices, "selectAudioDevice:", _delegate,
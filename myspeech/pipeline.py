@@ -0,0 +1,121 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+from myspeech.clipboard import ClipboardState
+from myspeech.streaming import StreamingSession
+from myspeech.tracing import Trace
+
+if TYPE_CHECKING:
+    import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class DictationJob:
+    """One press-to-paste cycle, carrying everything needed to deliver it."""
+
+    seq: int
+    trace: Trace
+    clipboard: Future  # Resolves to the ClipboardState saved when the hotkey was pressed
+    audio_bytes: bytes = b""
+    session: StreamingSession | None = None
+    transcribe: bool = False  # False: nothing to send (rejected recording), only restore focus
+    text: str | None = None
+    recording: "np.ndarray | None" = None  # Full capture, for the archive
+
+    def clipboard_state(self) -> ClipboardState:
+        try:
+            return self.clipboard.result()
+        except Exception:
+            return ClipboardState()
+
+
+class DictationPipeline:
+    """Bounded queue, fixed worker pool and an in-order sequencer.
+
+    Jobs are numbered when the hotkey is pressed. Workers transcribe them
+    concurrently, but a single sequencer thread delivers results strictly in
+    capture order, so back-to-back dictations never paste out of order.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[DictationJob], None],
+        deliver: Callable[[DictationJob], None],
+        workers: int,
+        max_pending: int,
+    ):
+        self._process = process
+        self._deliver = deliver
+        self._queue: queue.Queue[DictationJob | None] = queue.Queue(maxsize=max_pending)
+        self._next_seq = 0
+        self._deliver_seq = 0
+        self._finished: dict[int, DictationJob] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"dictation-worker-{i}", daemon=True)
+            for i in range(max(workers, 1))
+        ]
+        self._threads.append(threading.Thread(target=self._sequence, name="dictation-sequencer", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def begin(self, trace: Trace, clipboard: Future) -> DictationJob:
+        """Reserve the next slot in delivery order (call when recording starts)."""
+        with self._cond:
+            job = DictationJob(seq=self._next_seq, trace=trace, clipboard=clipboard)
+            self._next_seq += 1
+        return job
+
+    def submit(self, job: DictationJob):
+        """Queue a recorded job for transcription. Blocks if the queue is full."""
+        job.transcribe = True
+        if self._queue.full():
+            log.warning("Dictation queue full, waiting for a worker")
+        self._queue.put(job)
+
+    def skip(self, job: DictationJob):
+        """Complete a job without transcription so later jobs aren't held back."""
+        self._finish(job)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for _ in range(len(self._threads) - 1):
+            self._queue.put(None)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._process(job)
+            except Exception as e:
+                log.error(f"Dictation {job.seq} failed: {e}")
+            self._finish(job)
+
+    def _finish(self, job: DictationJob):
+        with self._cond:
+            self._finished[job.seq] = job
+            self._cond.notify_all()
+
+    def _sequence(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._deliver_seq in self._finished)
+                if self._stopped:
+                    return
+                job = self._finished.pop(self._deliver_seq)
+                self._deliver_seq += 1
+            try:
+                self._deliver(job)
+            except Exception as e:
+                log.error(f"Delivering dictation {job.seq} failed: {e}")
@@ -1,44 +1,107 @@
-import io
 import logging
-import wave
 import threading
+import time
+from typing import Callable
+
 import numpy as np
 import sounddevice as sd
 
 import config
+from myspeech import user_config
+from myspeech.capture import CaptureBuffer
+from myspeech.devices import DeviceChange, DeviceRegistry, InputDevice
+from myspeech.encoder import IncrementalEncoder, encode_flac, encode_wav, flac_available
+from myspeech.resample import Resampler
+from myspeech.ringbuffer import RingBuffer
+from myspeech.vad import AudioStats, PauseDetector, StreamStats, block_level, speech_bounds
 
 log = logging.getLogger(__name__)
 
 
-def get_input_devices() -> list[tuple[int, str]]:
-    """Get list of available audio input devices as (index, name) tuples."""
-    devices = sd.query_devices()
-    return [
-        (i, d['name'])
-        for i, d in enumerate(devices)
-        if d['max_input_channels'] > 0
-    ]
-
+# Initial capture buffer size; pages are only touched as audio arrives
+_INITIAL_BUFFER_SECONDS = 60
+# Longest stop() waits for a block still inside the audio callback
+_CALLBACK_WAIT_SECONDS = 0.05
 
-def get_default_input_device() -> int:
-    """Get the default input device index."""
-    return sd.default.device[0]
+# always: open at launch and never close; idle: close stream_idle_seconds after
+# the last recording; per_recording: close when each recording stops
+STREAM_POLICIES = ("always", "idle", "per_recording")
 
 
 class Recorder:
-    def __init__(self):
-        self._frames: list[np.ndarray] = []
+    def __init__(self, devices: DeviceRegistry):
+        self._devices = devices
+        self._capture = CaptureBuffer(config.CHANNELS, _INITIAL_BUFFER_SECONDS * config.SAMPLE_RATE)
+        self._stats = StreamStats(config.SAMPLE_RATE, config.VAD_MIN_RMS)  # Updated per block while recording
         self._stream: sd.InputStream | None = None
         self._lock = threading.Lock()
         self._recording = False
         self._device = config.AUDIO_DEVICE  # None means default
         self._device_name: str | None = None  # Stored name for reconnection recovery
         self._stream_active = False
+        self._idle_timer: threading.Timer | None = None  # Pending idle close ("idle" policy)
+        # Streaming mode: segments are cut at pauses and handed to _on_segment
+        self._on_segment: Callable[[np.ndarray], None] | None = None
+        self._segment_start = 0  # Sample offset where the open segment begins
+        self._in_callback = False  # Set while the callback handles a block; stop() waits it out
+        self._pause_detector = self._make_pause_detector()
+        # Pre-roll: keeps the last few hundred ms while idle so the first syllable is never lost
+        preroll_samples = int(config.PREROLL_SECONDS * config.SAMPLE_RATE)
+        self._preroll = RingBuffer(preroll_samples, config.CHANNELS) if preroll_samples > 0 else None
+        self._preroll_pending = False  # Set by start(); the callback moves pre-roll into the capture
+        # FLAC payloads are compressed in the background while recording
+        self._use_flac = config.AUDIO_FORMAT == "flac" and flac_available()
+        self._encoder: IncrementalEncoder | None = None
+        # Converts the device's native rate/channels to SAMPLE_RATE/CHANNELS; replaced per stream
+        self._resampler = Resampler(config.SAMPLE_RATE, config.SAMPLE_RATE, config.CHANNELS, config.CHANNELS)
+        self._resampler_stale = False  # Filter history predates an idle gap
+        self._convert_seconds = 0.0  # Callback CPU spent converting during this recording
+        self.last_recording: np.ndarray | None = None  # Full capture of the last stop()
+        user_config.subscribe(self._on_config_changed)
+        devices.subscribe(self._on_devices_changed)
+
+    def _make_pause_detector(self) -> PauseDetector:
+        return PauseDetector(
+            config.SAMPLE_RATE,
+            config.MIN_AUDIO_LEVEL,
+            config.STREAM_PAUSE_SECONDS,
+            config.STREAM_MIN_SEGMENT,
+        )
+
+    def _on_config_changed(self, changed: set[tuple[str, str]]):
+        if changed & {("audio", "min_level"), ("streaming", "pause"), ("streaming", "min_segment")}:
+            # Swapping the reference is atomic; the callback picks it up on its next block
+            self._pause_detector = self._make_pause_detector()
+
+    @property
+    def stream_policy(self) -> str:
+        """Effective stream lifecycle policy; pre-roll needs the stream always open."""
+        if self._preroll is not None:
+            return "always"
+        return config.STREAM_POLICY if config.STREAM_POLICY in STREAM_POLICIES else "per_recording"
+
+    def _on_devices_changed(self, change: DeviceChange):
+        """Follow the selected device to its new index after devices are re-enumerated."""
+        if self._device is None or not self._device_name:
+            return
+        device = change.snapshot.by_name.get(self._device_name)
+        if device is None:
+            if any(removed.name == self._device_name for removed in change.removed):
+                log.warning(f"Audio input '{self._device_name}' disconnected")
+        elif device.index != self._device:
+            log.info(f"Device '{self._device_name}' moved to index {device.index}, recovering")
+            self._device = device.index
+            config.AUDIO_DEVICE = device.index
+
+    @property
+    def stream_open(self) -> bool:
+        return self._stream_active
 
     def set_device(self, device_index: int | None):
         """Set the audio input device. None means use default."""
         self._device = device_index
-        self._device_name = None  # Will be populated on next successful open
+        device = self._devices.snapshot.get(device_index) if device_index is not None else None
+        self._device_name = device.name if device else None  # For remapping if the index moves
         # Restart stream with new device if it was running
         if self._stream_active:
             self._close_stream()
@@ -48,143 +111,306 @@ class Recorder:
         """Get the current audio input device index. None means default."""
         return self._device
 
+    def _stream_format(self, device: InputDevice) -> tuple[int, int]:
+        """Sample rate and channel count to open the device with."""
+        if not config.NATIVE_CAPTURE:
+            return config.SAMPLE_RATE, config.CHANNELS
+        rate = int(device.sample_rate) or config.SAMPLE_RATE
+        # A two-input device is a stereo mic and is downmixed. Larger interfaces open only the
+        # first `channels` inputs: averaging in unused ones would drop the level by 6 dB or more.
+        channels = 2 if device.channels == 2 else max(1, min(device.channels, config.CHANNELS))
+        return rate, channels
+
     def _open_stream(self):
         """Open and start the audio input stream."""
         if self._stream:
             return  # Already open
 
+        device = self._devices.snapshot.get(self._device)
+        if device is None:
+            raise RuntimeError(f"Audio input device {self._device if self._device is not None else 'default'} not found")
+        device_name = device.label if self._device is not None else f"Default ({device.label})"
+
+        rate, channels = self._stream_format(device)
+        self._resampler = Resampler(rate, config.SAMPLE_RATE, channels, config.CHANNELS)
+        self._resampler_stale = False
+        conversion = "" if self._resampler.passthrough else f" -> {config.SAMPLE_RATE} Hz x{config.CHANNELS}"
+        log.info(f"Opening audio stream (device={device_name}, rate={rate} Hz x{channels}{conversion})")
+        start = time.monotonic()
+        with self._devices.lock:
+            self._stream = sd.InputStream(
+                samplerate=rate,
+                channels=channels,
+                dtype=np.int16,
+                device=self._device,
+                callback=self._audio_callback,
+                blocksize=config.STREAM_BLOCKSIZE,
+                latency=config.STREAM_LATENCY,
+            )
+            self._stream.start()
+            self._stream_active = True
         if self._device is not None:
-            device_info = sd.query_devices(self._device)
-            device_name = f"[{self._device}] {device_info['name']}"
-        else:
-            default_idx = sd.default.device[0]
-            device_info = sd.query_devices(default_idx)
-            device_name = f"Default ([{default_idx}] {device_info['name']})"
-
-        log.info(f"Opening audio stream (device={device_name}, rate={config.SAMPLE_RATE})")
-        self._stream = sd.InputStream(
-            samplerate=config.SAMPLE_RATE,
-            channels=config.CHANNELS,
-            dtype=np.int16,
-            device=self._device,
-            callback=self._audio_callback,
+            self._device_name = device.name
+        log.info(
+            f"Audio stream started in {(time.monotonic() - start) * 1000:.0f} ms "
+            f"(policy={self.stream_policy}, blocksize={config.STREAM_BLOCKSIZE or 'auto'}, "
+            f"latency={self._stream.latency * 1000:.1f} ms)"
         )
-        self._stream.start()
-        self._stream_active = True
-        if self._device is not None:
-            self._device_name = device_info['name']
-        log.info("Audio stream started successfully")
 
     def _close_stream(self):
         """Close the audio stream."""
         if self._stream:
-            try:
-                self._stream.stop()
-                self._stream.close()
-            except Exception:
-                pass
-            self._stream = None
-            self._stream_active = False
+            with self._devices.lock:
+                try:
+                    self._stream.stop()
+                    self._stream.close()
+                except Exception:
+                    pass
+                self._stream = None
+                self._stream_active = False
 
     def _audio_callback(self, indata: np.ndarray, frames: int, time_info, status):
-        with self._lock:
-            if self._recording:
-                self._frames.append(indata.copy())
-
-    def _find_device_by_name(self, name: str) -> int | None:
-        """Search input devices for one matching name. Returns new index or None."""
+        # Runs on the PortAudio thread. Lock-free: this is the only writer of
+        # the capture buffer, stats, pre-roll and pause detector while recording.
+        # Flagged before _recording is read, so stop() knows when a block is in flight.
+        self._in_callback = True
         try:
-            for i, d in enumerate(sd.query_devices()):
-                if d['max_input_channels'] > 0 and d['name'] == name:
-                    return i
-        except Exception:
-            pass
-        return None
+            self._handle_block(indata)
+        finally:
+            self._in_callback = False
+
+    def _handle_block(self, indata: np.ndarray):
+        if not self._recording and self._preroll is None:
+            self._resampler_stale = True
+            return
+        resampler = self._resampler
+        if not resampler.passthrough:
+            start = time.thread_time()
+            if self._resampler_stale:
+                resampler.reset()
+                self._resampler_stale = False
+            indata = resampler.process(indata)
+            self._convert_seconds += time.thread_time() - start
+        if self._recording:
+            capture = self._capture
+            first = len(capture)
+            if self._preroll_pending:
+                self._preroll_pending = False
+                if len(self._preroll):
+                    capture.append(self._preroll.read(), config.AUDIO_GAIN)
+                    self._preroll.clear()
+            block_start = len(capture)
+            capture.append(indata, config.AUDIO_GAIN)
+            self._stats.feed(capture.view(first))  # After gain, as it will be sent
+            on_segment = self._on_segment  # stop() may clear it at any moment
+            if on_segment and self._pause_detector.feed(capture.view(block_start)):
+                start, end = self._segment_start, len(capture)
+                self._segment_start = end  # Published first, so the tail never repeats this segment
+                on_segment(capture.view(start, end))
+        else:
+            self._preroll.write(indata)
+
+    def _cancel_idle_close(self):
+        with self._lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+
+    def _release_stream(self):
+        """Apply the stream policy after a recording stops."""
+        policy = self.stream_policy
+        if policy == "per_recording":
+            self._close_stream()
+        elif policy == "idle":
+            with self._lock:
+                if self._idle_timer is not None:
+                    self._idle_timer.cancel()
+                self._idle_timer = threading.Timer(config.STREAM_IDLE_SECONDS, self._on_idle_timer)
+                self._idle_timer.name = "stream-idle"
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+
+    def _on_idle_timer(self):
+        with self._lock:
+            # A timer cancelled by ensure_stream() while waiting for the lock must not close
+            if self._idle_timer is not threading.current_thread() or self._recording:
+                return
+            self._idle_timer = None
+            log.info(f"Audio stream idle for {config.STREAM_IDLE_SECONDS}s, closing")
+            self._close_stream()
 
     def ensure_stream(self):
         """Ensure the audio stream is open."""
+        self._cancel_idle_close()
         if not self._stream_active:
             try:
                 self._open_stream()
             except Exception as e:
                 log.warning(f"Failed to open audio stream: {e}")
-                log.info("Reinitializing PortAudio and retrying...")
+                log.info("Refreshing audio devices and retrying...")
                 try:
-                    sd._terminate()
-                    sd._initialize()
-                    # If a named device was previously used, find it at its new index
-                    if self._device is not None and self._device_name:
-                        recovered = self._find_device_by_name(self._device_name)
-                        if recovered is not None and recovered != self._device:
-                            log.info(f"Device '{self._device_name}' moved to index {recovered}, recovering")
-                            self._device = recovered
-                            config.AUDIO_DEVICE = recovered
+                    self._close_stream()  # A stream that failed to start still holds the device
+                    # Re-enumerates devices; _on_devices_changed follows a moved device
+                    self._devices.refresh(reinitialize=True)
                     self._open_stream()
                 except Exception as e2:
                     log.error(f"Failed to open audio stream after reinit: {e2}")
 
-    def start(self):
-        """Start recording. Stream is opened on first call and kept running."""
+    def start(self, on_segment: Callable[[np.ndarray], None] | None = None):
+        """Start recording, opening the stream if it isn't already.
+
+        Whether the stream stays open after stop() depends on stream_policy.
+
+        If on_segment is given (streaming mode), it is called from the audio
+        callback with the samples of each segment cut at a pause. It must not block.
+        """
         # Ensure stream is running (instant if already open)
         self.ensure_stream()
 
         with self._lock:
-            self._frames = []
+            # A fresh buffer per recording: the previous one may still be read
+            # by a transcription thread through zero-copy views.
+            self._capture = CaptureBuffer(config.CHANNELS, _INITIAL_BUFFER_SECONDS * config.SAMPLE_RATE)
+            self._stats = StreamStats(config.SAMPLE_RATE, config.VAD_MIN_RMS)
+            self._segment_start = 0
+            self._pause_detector.reset()
+            self._on_segment = on_segment
+            self._preroll_pending = self._preroll is not None
+            self._convert_seconds = 0.0
+            if self._use_flac and on_segment is None:
+                self._encoder = IncrementalEncoder(self._capture, config.VAD_ENABLED)
             self._recording = True
         log.info("Recording started")
 
+    def _gate(self, audio_data: np.ndarray, stats: AudioStats | None = None) -> tuple[int, int] | None:
+        """Return the sample range worth sending, or None to skip the server call.
+
+        With VAD enabled, leading/trailing silence is trimmed and clips without
+        speech frames are dropped; otherwise the average level is checked.
+        Running stats for the same samples, when given, reject silent clips
+        without another pass over the audio.
+        """
+        if not len(audio_data):
+            return None
+        if config.VAD_ENABLED:
+            if stats is not None and stats.voiced_samples < config.VAD_MIN_SPEECH * config.SAMPLE_RATE:
+                log.info("VAD: no speech detected, skipping")
+                return None
+            bounds = speech_bounds(
+                audio_data,
+                config.SAMPLE_RATE,
+                min_rms=config.VAD_MIN_RMS,
+                min_speech_seconds=config.VAD_MIN_SPEECH,
+                padding_seconds=config.VAD_PADDING,
+            )
+            if bounds is None:
+                log.info("VAD: no speech detected, skipping")
+                return None
+            if bounds[1] - bounds[0] < len(audio_data):
+                log.info(
+                    f"VAD: trimmed {len(audio_data) / config.SAMPLE_RATE:.2f}s"
+                    f" -> {(bounds[1] - bounds[0]) / config.SAMPLE_RATE:.2f}s"
+                )
+            return bounds
+        level = stats.level if stats is not None else block_level(audio_data)
+        if level < config.MIN_AUDIO_LEVEL:
+            return None
+        return 0, len(audio_data)
+
+    def _encode(self, audio_data: np.ndarray) -> bytes:
+        """Encode samples in the configured upload format."""
+        if self._use_flac:
+            return encode_flac(audio_data)
+        return encode_wav(audio_data)
+
+    def encode_segment(self, audio_data: np.ndarray) -> bytes:
+        """Encode a streamed segment for upload. Returns b"" for silent segments."""
+        log.info(f"Segment: duration={len(audio_data) / config.SAMPLE_RATE:.2f}s")
+        bounds = self._gate(audio_data)
+        if bounds is None:
+            return b""
+        return self._encode(audio_data[bounds[0]:bounds[1]])
+
     def stop(self) -> bytes:
-        """Stop recording, close the audio stream, and return audio data."""
-        with self._lock:
-            self._recording = False
-            frames = self._frames
-            self._frames = []
+        """Stop recording and return audio data.
 
-        log.info(f"Recording stopped, captured {len(frames)} frames")
-        self._close_stream()
+        The stream is closed now, after stream_idle_seconds, or never,
+        depending on stream_policy (always open with pre-roll).
 
-        if not frames:
+        In streaming mode only the last open segment is returned; earlier
+        segments have already been handed to on_segment.
+        """
+        with self._lock:
+            self._recording = False
+            self._on_segment = None
+            # Let a block already in the callback land, so its samples, stats and any
+            # segment it cuts are accounted for before the tail is taken
+            deadline = time.monotonic() + _CALLBACK_WAIT_SECONDS
+            while self._in_callback and time.monotonic() < deadline:
+                time.sleep(0.0005)
+            audio_data = self._capture.view()
+            segment_start = self._segment_start
+            encoder, self._encoder = self._encoder, None
+        stats = self._stats.snapshot
+
+        log.info(f"Recording stopped, captured {len(audio_data)} samples")
+        resampler = self._resampler
+        if not resampler.passthrough and len(audio_data):
+            cost = self._convert_seconds / (len(audio_data) / config.SAMPLE_RATE)
+            log.info(f"Converted {resampler.in_rate} Hz input: {cost * 1000:.2f} ms CPU per second of audio")
+        # Kept for the archive, including rejected clips so failed recordings can be
+        # reviewed; the archive worker writes it to disk off the release-to-paste path
+        self.last_recording = audio_data
+        self._release_stream()
+
+        if not len(audio_data):
+            if encoder:
+                encoder.cancel()
             return b""
 
-        audio_data = np.concatenate(frames, axis=0)
-
-        # Apply gain if configured (boost quiet microphones)
         if config.AUDIO_GAIN != 1.0:
-            # Convert to float, apply gain, clip to int16 range, convert back
-            audio_float = audio_data.astype(np.float32) * config.AUDIO_GAIN
-            audio_data = np.clip(audio_float, -32768, 32767).astype(np.int16)
             log.info(f"Applied gain: {config.AUDIO_GAIN}x")
 
         # Check minimum duration (0.5 seconds)
         duration = len(audio_data) / config.SAMPLE_RATE
-        audio_level = np.abs(audio_data).mean()
-        log.info(f"Recording: duration={duration:.2f}s, level={audio_level:.0f}")
-
-        # Convert to WAV bytes
-        buffer = io.BytesIO()
-        with wave.open(buffer, "wb") as wf:
-            wf.setnchannels(config.CHANNELS)
-            wf.setsampwidth(2)  # 16-bit = 2 bytes
-            wf.setframerate(config.SAMPLE_RATE)
-            wf.writeframes(audio_data.tobytes())
-
-        wav_bytes = buffer.getvalue()
-
-        # Save recording to file (before level check, so we can review failed recordings)
-        if config.SAVE_RECORDING:
-            with open(config.RECORDING_PATH, "wb") as f:
-                f.write(wav_bytes)
+        log.info(
+            f"Recording: duration={duration:.2f}s, level={stats.level:.0f}, rms={stats.rms:.0f}, "
+            f"peak={stats.peak_dbfs:.1f} dBFS, clipped={stats.clipped}, "
+            f"voiced={stats.voiced_samples / config.SAMPLE_RATE:.2f}s"
+        )
+        if stats.clipped:
+            log.warning(f"{stats.clipped} samples clipped at full scale (gain {config.AUDIO_GAIN}x)")
 
         # Skip if too short or silent
-        if duration < config.MIN_RECORDING_DURATION:
+        bounds = None
+        if duration >= config.MIN_RECORDING_DURATION:
+            # Streaming: only the tail after the last cut still needs transcribing,
+            # and the running stats cover the whole recording, not the tail
+            bounds = self._gate(audio_data[segment_start:], stats if segment_start == 0 else None)
+
+        if bounds is None:
+            if encoder:
+                encoder.cancel()
             return b""
+        start, end = segment_start + bounds[0], segment_start + bounds[1]
 
-        if audio_level < config.MIN_AUDIO_LEVEL:
-            return b""
+        if encoder:
+            payload = encoder.finish(start, end)
+            if payload:
+                return payload
 
-        return wav_bytes
+        return self._encode(audio_data[start:end])
+
+    def close(self):
+        """Close the stream and cancel any pending idle close."""
+        self._cancel_idle_close()
+        self._close_stream()
+
+    @property
+    def stats(self) -> AudioStats:
+        """Live level statistics of the current (or last) recording."""
+        return self._stats.snapshot
 
     @property
     def is_recording(self) -> bool:
-        with self._lock:
-            return self._recording
+        return self._recording
@@ -0,0 +1,85 @@
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_ZERO_CROSSINGS = 16  # Sinc lobes kept on each side of the filter centre
+_KAISER_BETA = 8.0  # ~80 dB stopband attenuation
+_CUTOFF = 0.95  # Fraction of the output Nyquist frequency passed
+
+
+def design_filter(up: int, down: int, zero_crossings: int = _ZERO_CROSSINGS) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass as an (up, taps) polyphase matrix.
+
+    Row p holds the taps used for output samples whose upsampled position
+    has phase p; each row sums to ~1 so levels are preserved.
+    """
+    ratio = max(up, down)
+    half = zero_crossings * ratio
+    m = np.arange(-half, half + 1, dtype=np.float64)
+    h = _CUTOFF * up / ratio * np.sinc(_CUTOFF * m / ratio) * np.kaiser(len(m), _KAISER_BETA)
+    taps = -(-len(h) // up)
+    h = np.concatenate([h, np.zeros(taps * up - len(h))])
+    return h.reshape(taps, up).T.astype(np.float32)
+
+
+class Resampler:
+    """Streaming rational-ratio polyphase resampler with downmix.
+
+    Converts int16 (frames, in_channels) blocks at in_rate to int16
+    (frames, out_channels) at out_rate. More input channels than output
+    channels are averaged. Filter history carries across process() calls,
+    so block boundaries are seamless; the output lags the input by half the
+    filter length (about 1 ms).
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, in_channels: int, out_channels: int = 1):
+        divisor = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self._up = out_rate // divisor
+        self._down = in_rate // divisor
+        self._in_channels = in_channels
+        self._out_channels = out_channels
+        self._downmix = in_channels != out_channels
+        self.passthrough = self._up == self._down and not self._downmix
+        # Taps reversed so they line up with oldest-first sliding windows
+        self._filter = design_filter(self._up, self._down)[:, ::-1].copy() if self._up != self._down else None
+        taps = self._filter.shape[1] if self._filter is not None else 1
+        self._history = np.zeros((taps - 1, out_channels), dtype=np.float32)
+        self._t = 0  # Upsampled position of the next output, relative to the first new input sample
+
+    def _mix(self, block: np.ndarray) -> np.ndarray:
+        if not self._downmix:
+            return block.astype(np.float32)
+        if self._out_channels == 1:
+            return block.mean(axis=1, dtype=np.float32, keepdims=True)
+        if self._in_channels == 1:
+            return np.repeat(block.astype(np.float32), self._out_channels, axis=1)
+        return block[:, :self._out_channels].astype(np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Convert one block; may return a few samples more or less than the exact ratio."""
+        if self.passthrough:
+            return block
+        x = self._mix(block)
+        if self._filter is None:
+            return np.rint(x).astype(np.int16)
+
+        n_in = len(x)
+        up, down = self._up, self._down
+        n_out = max(-(-(n_in * up - self._t) // down), 0)
+        positions = self._t + np.arange(n_out) * down
+        x = np.concatenate([self._history, x])
+        # Output i is the dot product of its phase's taps with the `taps` inputs ending at positions[i] // up
+        windows = sliding_window_view(x, len(self._history) + 1, axis=0)[positions // up]  # (n_out, channels, taps)
+        y = np.einsum("nck,nk->nc", windows, self._filter[positions % up])
+        self._t += n_out * down - n_in * up
+        if len(self._history):
+            self._history = x[-len(self._history):]
+        np.clip(y, -32768, 32767, out=y)
+        return np.rint(y).astype(np.int16)
+
+    def reset(self):
+        self._history[:] = 0
+        self._t = 0
@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+import config
+from myspeech.server import ServerManager
+from myspeech.transcriber import Transcriber
+
+log = logging.getLogger(__name__)
+
+MODES = ("off", "keep_warm", "idle_unload", "on_demand")
+
+LOADED = "loaded"
+LOADING = "loading"
+UNLOADING = "unloading"
+UNLOADED = "unloaded"
+
+
+class ResidencyManager:
+    """Decides how long the Whisper model stays resident on the server.
+
+    Modes:
+        off          Server is started at launch and left alone (previous behaviour).
+        keep_warm    Periodic tiny transcription while idle, so the OS doesn't
+                     page the model weights out.
+        idle_unload  Stop the server after `idle_minutes` without a dictation;
+                     restart it as soon as the hotkey is pressed again.
+        on_demand    Like idle_unload, but the server isn't started at launch.
+    """
+
+    def __init__(self, server: ServerManager, transcriber: Transcriber):
+        self._server = server
+        self._transcriber = transcriber
+        self._mode = config.RESIDENCY_MODE if config.RESIDENCY_MODE in MODES else "off"
+        self._state = UNLOADED
+        self._last_used = time.monotonic()
+        self._last_ping = time.monotonic()
+        self._reload_requested = False  # touch() arrived while unloading
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def state(self) -> str:
+        with self._cond:
+            return self._state
+
+    @property
+    def loads_at_launch(self) -> bool:
+        return self._mode != "on_demand"
+
+    def load_in_background(self, on_done: Callable[[bool], None] | None = None):
+        """Start the server at launch without blocking. Dictations recorded in
+        the meantime wait in ensure_loaded() and go out as soon as it is up."""
+        with self._cond:
+            if self._state != UNLOADED:
+                return
+            self._state = LOADING
+        threading.Thread(
+            target=self._load, args=(config.WARMUP, on_done), name="server-loader", daemon=True
+        ).start()
+
+    def start(self):
+        if self._mode == "off":
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def touch(self):
+        """Note a dictation starting. Begins a reload in the background if unloaded,
+        so the model loads while the user is still speaking."""
+        with self._cond:
+            self._last_used = time.monotonic()
+            if self._state == UNLOADING:
+                self._reload_requested = True  # _unload() starts it once the server is down
+                return
+            if self._mode == "off" or self._state != UNLOADED:
+                return
+            self._state = LOADING
+        threading.Thread(target=self._load, daemon=True).start()
+
+    def ensure_loaded(self) -> bool:
+        """Block until the server is loaded. Returns False if loading failed."""
+        with self._cond:
+            self._last_used = time.monotonic()
+            # Loading while the old process is still being stopped would find it and report success
+            self._cond.wait_for(lambda: self._state != UNLOADING)
+            # "off" never reloads, but still waits for the launch load
+            start_load = self._state == UNLOADED and self._mode != "off"
+            if start_load:
+                self._state = LOADING
+        if start_load:
+            self._load()
+        with self._cond:
+            if self._state == LOADING:
+                log.info("Residency: waiting for the server before transcribing")
+            self._cond.wait_for(lambda: self._state != LOADING)
+            return self._state == LOADED or self._mode == "off"
+
+    def _load(self, warm_up: bool = True, on_done: Callable[[bool], None] | None = None):
+        log.info("Residency: loading model...")
+        start = time.monotonic()
+        ok = self._server.start()
+        if ok and warm_up:
+            self._transcriber.warm_up()
+        with self._cond:
+            self._state = LOADED if ok else UNLOADED
+            self._last_used = self._last_ping = time.monotonic()
+            self._cond.notify_all()
+        if ok:
+            log.info(f"Residency: {LOADED} (mode={self._mode}), load took {time.monotonic() - start:.1f}s")
+        else:
+            log.error("Residency: load failed")
+        if on_done:
+            on_done(ok)
+
+    def _unload(self, idle: float):
+        with self._cond:
+            if self._state != LOADED:
+                return
+            if not self._server.is_managed():
+                return
+            self._state = UNLOADING
+        freed = 0
+        try:
+            freed = self._server.get_memory_mb() or 0
+            self._server.stop()
+        finally:
+            with self._cond:
+                self._state = UNLOADED
+                reload, self._reload_requested = self._reload_requested, False
+                if reload:
+                    self._state = LOADING
+                self._cond.notify_all()
+        log.info(f"Residency: {UNLOADED} after {idle / 60:.0f} min idle (freed ~{freed:,} MB)")
+        if reload:
+            log.info("Residency: dictation started while unloading, reloading")
+            self._load()
+
+    def _run(self):
+        if self._mode in ("idle_unload", "on_demand") and not self._server.is_managed():
+            log.warning("Residency: server was not started by MySpeech, it cannot be unloaded")
+        while not self._stop.wait(config.RESIDENCY_CHECK_INTERVAL):
+            now = time.monotonic()
+            with self._cond:
+                state = self._state
+                idle = now - self._last_used
+                since_ping = now - self._last_ping
+            if state != LOADED:
+                continue
+
+            if self._mode == "keep_warm":
+                if idle >= config.KEEP_WARM_INTERVAL and since_ping >= config.KEEP_WARM_INTERVAL:
+                    elapsed = self._transcriber.warm_up()
+                    with self._cond:
+                        self._last_ping = time.monotonic()
+                    if elapsed is not None:
+                        log.info(f"Residency: keep-warm ping after {idle / 60:.0f} min idle")
+            elif idle >= config.IDLE_UNLOAD_MINUTES * 60:
+                self._unload(idle)
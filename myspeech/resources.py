@@ -0,0 +1,153 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+from myspeech.server import ServerManager, get_process_memory_mb, get_system_memory
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MemorySample:
+    taken: float  # time.monotonic() when sampled
+    app_mb: int
+    server_mb: int | None  # None if the server isn't running
+    system: tuple[int, int, int] | None  # (total_mb, used_mb, free_mb)
+
+
+class MemoryProvider(Protocol):
+    def process_mb(self, pid: int) -> int: ...
+    def server_mb(self) -> int | None: ...
+    def system_memory(self) -> tuple[int, int, int] | None: ...
+
+
+class MacProvider:
+    """ps/top/vm_stat based readings. Spawns processes, so only call it from the sampler thread."""
+
+    def __init__(self, server: ServerManager):
+        self._server = server
+
+    def process_mb(self, pid: int) -> int:
+        return get_process_memory_mb(pid)
+
+    def server_mb(self) -> int | None:
+        return self._server.get_memory_mb()
+
+    def system_memory(self) -> tuple[int, int, int] | None:
+        return get_system_memory()
+
+
+class ProcProvider:
+    """Reads /proc directly (Linux). No process spawns."""
+
+    def __init__(self, root: Path = Path("/proc"), server_pattern: bytes = b"mlx_audio.server"):
+        self._root = root
+        self._server_pattern = server_pattern
+
+    def process_mb(self, pid: int) -> int:
+        try:
+            for line in (self._root / str(pid) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) // 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return 0
+
+    def server_mb(self) -> int | None:
+        total, found = 0, False
+        for entry in self._root.iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                cmdline = (entry / "cmdline").read_bytes()
+            except OSError:
+                continue
+            if self._server_pattern in cmdline:
+                found = True
+                total += self.process_mb(int(entry.name))
+        return total if found else None
+
+    def system_memory(self) -> tuple[int, int, int] | None:
+        try:
+            info = {}
+            for line in (self._root / "meminfo").read_text().splitlines():
+                key, _, value = line.partition(":")
+                info[key] = int(value.split()[0])  # kB
+            total_mb = info["MemTotal"] // 1024
+            free_mb = info["MemAvailable"] // 1024
+        except (OSError, ValueError, IndexError, KeyError):
+            return None
+        return (total_mb, total_mb - free_mb, free_mb)
+
+
+def default_provider(server: ServerManager) -> MemoryProvider | None:
+    if sys.platform == "darwin":
+        return MacProvider(server)
+    if Path("/proc/meminfo").exists():
+        return ProcProvider()
+    return None
+
+
+class ResourceSampler:
+    """Samples memory on a background thread and keeps the last `history` readings.
+
+    Readers get the latest cached sample without blocking, so logging memory
+    after a dictation never spawns a process on the dictation path.
+    """
+
+    def __init__(self, provider: MemoryProvider | None, interval: float = 10.0, history: int = 360):
+        self._provider = provider
+        self._interval = interval
+        self._samples: deque[MemorySample] = deque(maxlen=max(history, 1))
+        self._latest: MemorySample | None = None
+        self._pid = os.getpid()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._provider is None:
+            log.info("Memory sampling unavailable on this platform")
+            return
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def latest(self) -> MemorySample | None:
+        return self._latest
+
+    def history(self) -> list[MemorySample]:
+        return list(self._samples)
+
+    def refresh(self):
+        """Take the next sample now instead of waiting for the interval."""
+        self._wake.set()
+
+    def _sample(self) -> MemorySample:
+        return MemorySample(
+            taken=time.monotonic(),
+            app_mb=self._provider.process_mb(self._pid),
+            server_mb=self._provider.server_mb(),
+            system=self._provider.system_memory(),
+        )
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sample = self._sample()
+            except Exception as e:
+                log.debug(f"Memory sample failed: {e}")
+            else:
+                self._samples.append(sample)
+                self._latest = sample
+            self._wake.wait(self._interval)
+            self._wake.clear()
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-size int16 ring buffer that always holds the most recent samples."""
+
+    def __init__(self, capacity: int, channels: int):
+        self._buf = np.zeros((capacity, channels), dtype=np.int16)
+        self._capacity = capacity
+        self._pos = 0  # Next write position
+        self._filled = 0
+
+    def __len__(self) -> int:
+        return self._filled
+
+    def write(self, block: np.ndarray):
+        """Append a block, overwriting the oldest samples once full."""
+        n = len(block)
+        cap = self._capacity
+        if n >= cap:
+            self._buf[:] = block[n - cap:]
+            self._pos = 0
+            self._filled = cap
+            return
+
+        end = self._pos + n
+        if end <= cap:
+            self._buf[self._pos:end] = block
+        else:
+            first = cap - self._pos
+            self._buf[self._pos:] = block[:first]
+            self._buf[:n - first] = block[first:]
+        self._pos = end % cap
+        self._filled = min(cap, self._filled + n)
+
+    def read(self) -> np.ndarray:
+        """Return a chronological copy of the buffered samples."""
+        if self._filled < self._capacity:
+            return self._buf[:self._filled].copy()
+        return np.concatenate((self._buf[self._pos:], self._buf[:self._pos]))
+
+    def clear(self):
+        self._pos = 0
+        self._filled = 0
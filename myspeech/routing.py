@@ -0,0 +1,61 @@
+import logging
+import statistics
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Route:
+    max_seconds: float  # Clips up to this long go to `model`
+    model: str
+
+
+def parse_routes(raw: Iterable[Mapping]) -> list[Route]:
+    """Build routes from [routing] routes entries, shortest first. Bad entries are skipped."""
+    routes = []
+    for entry in raw or ():
+        try:
+            routes.append(Route(float(entry["max_seconds"]), str(entry["model"])))
+        except (KeyError, TypeError, ValueError) as e:
+            log.warning(f"Ignoring invalid route {dict(entry) if isinstance(entry, Mapping) else entry!r}: {e}")
+    return sorted(routes, key=lambda route: route.max_seconds)
+
+
+class ModelRouter:
+    """Picks a model by clip duration and keeps recent latency per model.
+
+    Clips no longer than a route's max_seconds go to the first matching
+    route; longer clips (or clips of unknown length) use the default model.
+    """
+
+    def __init__(self, routes: list[Route], default_model: str, window: int = 50):
+        self._routes = routes
+        self._default = default_model
+        self._window = window
+        self._latency: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def models(self) -> list[str]:
+        return list(dict.fromkeys([route.model for route in self._routes] + [self._default]))
+
+    def choose(self, seconds: float | None) -> str:
+        if seconds is not None:
+            for route in self._routes:
+                if seconds <= route.max_seconds:
+                    return route.model
+        return self._default
+
+    def record(self, model: str, seconds: float | None, elapsed: float):
+        """Log a routed request with the model's rolling median latency."""
+        with self._lock:
+            samples = self._latency.setdefault(model, deque(maxlen=self._window))
+            samples.append(elapsed)
+            median = statistics.median(samples)
+            count = len(samples)
+        clip = f"{seconds:.1f}s" if seconds is not None else "unknown-length"
+        log.info(f"Routed {clip} clip to {model}: {elapsed:.2f}s (median {median:.2f}s over {count})")
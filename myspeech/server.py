@@ -59,6 +59,14 @@ class ServerManager:
         except (urllib.error.URLError, TimeoutError):
             return False
 
+    def is_managed(self) -> bool:
+        """Whether the server process was started (and can be stopped) by us."""
+        return self._process is not None
+
+    def can_start(self) -> bool:
+        """Whether a server is running or can be launched on demand."""
+        return self.is_running() or self._find_server_command() is not None
+
     def _find_server_command(self) -> str | None:
         """Find mlx_audio.server in PATH or common locations."""
         # Check PATH first
@@ -110,20 +118,27 @@ class ServerManager:
         port = str(urlparse(config.MLX_AUDIO_SERVER_URL).port or 8765)
 
         self._process = subprocess.Popen(
-            [server_cmd, "--port", port, "--workers", "1"],
+            [server_cmd, "--port", port, "--workers", str(config.SERVER_WORKERS)],
             stdout=self._server_log_file,
             stderr=self._server_log_file,
             env=env,
             cwd=Path.home(),  # Run from home dir to avoid read-only issues
         )
 
-        # Wait for server to be ready
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        # Wait for server to be ready, probing often at first and backing off
+        # to every couple of seconds while the model loads
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        delay = 0.05
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                log.error(f"mlx-audio server exited with code {self._process.returncode}")
+                break
             if self.is_running():
-                log.info("mlx-audio server started.")
+                log.info(f"mlx-audio server started in {time.monotonic() - start_time:.1f}s.")
                 return True
-            time.sleep(1)
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(delay * 2, 2.0)
 
         log.error("Failed to start mlx-audio server.")
         self.stop()
@@ -0,0 +1,70 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+class StreamingSession:
+    """Transcribes finished segments of a dictation while it is still being recorded.
+
+    `submit` is called from the audio callback whenever the recorder cuts a
+    segment at a pause, so it only queues work. `finish` waits for every queued
+    segment plus the final open one and joins the texts in capture order.
+    """
+
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor,
+        transcribe: Callable[[bytes], str | None],
+        encode: Callable[["np.ndarray"], bytes],
+    ):
+        self._executor = executor
+        self._transcribe = transcribe
+        self._encode = encode
+        self._futures: list[Future] = []
+        self._lock = threading.Lock()
+
+    @property
+    def has_segments(self) -> bool:
+        with self._lock:
+            return bool(self._futures)
+
+    def submit(self, audio_data: "np.ndarray"):
+        """Queue a finished segment for background transcription. Called from the audio callback: no logging."""
+        with self._lock:
+            number = len(self._futures) + 1
+            self._futures.append(self._executor.submit(self._run, audio_data, number))
+
+    def _run(self, audio_data: "np.ndarray", number: int) -> str | None:
+        log.info(f"Streaming: segment {number} started")
+        audio_bytes = self._encode(audio_data)
+        if not audio_bytes:
+            return None
+        return self._transcribe(audio_bytes)
+
+    def finish(self, tail_bytes: bytes) -> str | None:
+        """Transcribe the last open segment and return the joined text."""
+        with self._lock:
+            futures = list(self._futures)
+
+        tail = self._transcribe(tail_bytes) if tail_bytes else None
+
+        parts = []
+        for future in futures:
+            try:
+                text = future.result()
+            except Exception as e:
+                log.warning(f"Streaming segment failed: {e}")
+                text = None
+            if text:
+                parts.append(text)
+        if tail:
+            parts.append(tail)
+
+        log.info(f"Streaming: joined {len(parts)} of {len(futures) + 1} segments")
+        return " ".join(parts) if parts else None
@@ -0,0 +1,126 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Stages in pipeline order, used for the summary line
+# ("restore" runs on a timer after the dictation is delivered and arrives via record_late)
+STAGES = ("hotkey", "stream_open", "capture", "encode", "transcribe", "paste", "restore", "release_to_paste")
+
+
+class Trace:
+    """Monotonic-clock spans for one dictation."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self.started = time.time()
+        self.spans: dict[str, tuple[float, float]] = {}
+        self.marks: dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.spans[name] = (start, time.monotonic())
+
+    def add_span(self, name: str, start: float, end: float | None = None):
+        self.spans[name] = (start, time.monotonic() if end is None else end)
+
+    def mark(self, name: str, at: float | None = None):
+        self.marks[name] = time.monotonic() if at is None else at
+
+    def durations(self) -> dict[str, float]:
+        """Seconds per span, plus release-to-paste when both ends are known."""
+        result = {name: end - start for name, (start, end) in self.spans.items()}
+        if "release" in self.marks and "paste" in self.spans:
+            result["release_to_paste"] = self.spans["paste"][1] - self.marks["release"]
+        return result
+
+
+class Tracer:
+    """Writes finished traces as JSONL and keeps rolling percentiles per stage."""
+
+    def __init__(self, path: Path | None, window: int = 200, summary_every: int = 10):
+        self._path = path
+        self._window = window
+        self._summary_every = summary_every
+        self._samples: dict[str, deque[float]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+    def begin(self) -> Trace:
+        return Trace()
+
+    def finish(self, trace: Trace, outcome: str):
+        durations = trace.durations()
+        record = {
+            "id": trace.id,
+            "ts": round(trace.started, 3),
+            "outcome": outcome,
+            "ms": {name: round(seconds * 1000, 1) for name, seconds in durations.items()},
+        }
+        log.info(f"Trace {trace.id} ({outcome}): " + ", ".join(
+            f"{name}={ms:.0f}ms" for name, ms in record["ms"].items()
+        ))
+
+        with self._lock:
+            if self._path is not None:
+                try:
+                    with open(self._path, "a") as f:
+                        f.write(json.dumps(record) + "\n")
+                except OSError as e:
+                    log.debug(f"Failed to write trace: {e}")
+            for name, seconds in durations.items():
+                self._samples.setdefault(name, deque(maxlen=self._window)).append(seconds)
+            self._count += 1
+            if self._count % self._summary_every == 0:
+                log.info(self._summary())
+
+    def record_late(self, trace: Trace, name: str, start: float, end: float):
+        """Add a span that ended after the trace was finished (e.g. the delayed clipboard restore)."""
+        trace.add_span(name, start, end)
+        ms = round((end - start) * 1000, 1)
+        log.info(f"Trace {trace.id}: {name}={ms:.0f}ms")
+        with self._lock:
+            if self._path is not None:
+                try:
+                    with open(self._path, "a") as f:
+                        f.write(json.dumps({"id": trace.id, "ts": round(trace.started, 3), "late": True, "ms": {name: ms}}) + "\n")
+                except OSError as e:
+                    log.debug(f"Failed to write trace: {e}")
+            self._samples.setdefault(name, deque(maxlen=self._window)).append(end - start)
+
+    def percentiles(self) -> dict[str, tuple[float, float, float]]:
+        """(p50, p95, p99) in seconds per stage over the rolling window."""
+        with self._lock:
+            return self._percentiles()
+
+    def _percentiles(self) -> dict[str, tuple[float, float, float]]:
+        import numpy as np
+
+        return {
+            name: tuple(float(v) for v in np.percentile(np.fromiter(values, dtype=float), (50, 95, 99)))
+            for name, values in self._samples.items()
+            if values
+        }
+
+    def _summary(self) -> str:
+        stats = self._percentiles()
+        parts = [
+            f"{name} {p50 * 1000:.0f}/{p95 * 1000:.0f}/{p99 * 1000:.0f}"
+            for name in STAGES
+            if name in stats
+            for p50, p95, p99 in [stats[name]]
+        ]
+        n = min(self._count, self._window)
+        return f"Latency p50/p95/p99 ms over last {n} dictations: " + ", ".join(parts)
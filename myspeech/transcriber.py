@@ -1,33 +1,209 @@
 import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import numpy as np
 from openai import OpenAI
 
 import config
+from myspeech import user_config
+from myspeech.cache import TranscriptionCache, cache_key
+from myspeech.chunking import chunk_bounds, stitch
+from myspeech.encoder import audio_duration, audio_format, decode, encode, encode_wav, transcode
+from myspeech.endpoints import Endpoint, EndpointPool, parse_endpoints
+from myspeech.routing import ModelRouter, parse_routes
+
+log = logging.getLogger(__name__)
+
+# Extra read timeout per second of audio on top of [server] timeout, so a long clip
+# isn't cut off mid-transcription and re-sent in full by the retry
+_TIMEOUT_PER_AUDIO_SECOND = 1.0
+
+
+def _warmup_clip(seconds: float = 0.5) -> bytes:
+    """Short low-level tone, enough to make the server load and run the model."""
+    t = np.arange(int(seconds * config.SAMPLE_RATE)) / config.SAMPLE_RATE
+    tone = (1000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    return encode_wav(np.repeat(tone[:, None], config.CHANNELS, axis=1))
 
 
 class Transcriber:
     def __init__(self):
-        self.client = OpenAI(
+        self._pool = self._make_pool()
+        self._pool_lock = threading.Lock()  # Swapping the pool vs. acquiring it
+        self._cache: TranscriptionCache | None = None
+        if config.CACHE_ENABLED:
+            disk_dir = Path(config.CACHE_DIR).expanduser() if config.CACHE_DISK else None
+            self._cache = TranscriptionCache(
+                config.CACHE_MAX_ENTRIES, disk_dir, int(config.CACHE_MAX_DISK_MB * 1024 * 1024)
+            )
+        self._router = self._make_router()
+        # Bounds how many chunks of one long clip are in flight (match the server's workers)
+        self._chunk_pool = ThreadPoolExecutor(max_workers=max(config.CHUNK_PARALLELISM, 1), thread_name_prefix="chunk")
+        user_config.subscribe(self._on_config_changed)
+
+    def _make_router(self) -> ModelRouter | None:
+        routes = parse_routes(config.ROUTES)
+        if not routes:
+            return None
+        log.info("Model routing: " + ", ".join(f"<= {r.max_seconds:g}s -> {r.model}" for r in routes)
+                 + f", else {config.WHISPER_MODEL}")
+        return ModelRouter(routes, config.WHISPER_MODEL)
+
+    def _make_client(self, url: str) -> tuple[httpx.Client, OpenAI]:
+        # One kept-alive connection per (usually local) server: no per-request
+        # TCP setup, fail fast on connect, and a single quick retry instead of
+        # the SDK's default back-off that is tuned for remote APIs.
+        http = httpx.Client(
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=300),
+            timeout=httpx.Timeout(config.REQUEST_TIMEOUT, connect=config.CONNECT_TIMEOUT),
+        )
+        client = OpenAI(
             api_key="local",  # Any string works for local server
-            base_url=config.MLX_AUDIO_SERVER_URL,
+            base_url=url,
+            http_client=http,
+            max_retries=config.MAX_RETRIES,
         )
+        return http, client
+
+    def _make_pool(self) -> EndpointPool:
+        endpoints = []
+        for url, fmt in parse_endpoints(config.MLX_AUDIO_SERVER_URL, config.AUDIO_FORMAT, config.EXTRA_ENDPOINTS):
+            http, client = self._make_client(url)
+            endpoints.append(Endpoint(url, fmt, client, http.close))
+        if len(endpoints) > 1:
+            log.info("Transcription endpoints: " + ", ".join(f"{e.url} ({e.format})" for e in endpoints))
+        return EndpointPool(endpoints, config.HEDGE, config.HEDGE_PERCENTILE, config.HEDGE_MIN_DELAY)
+
+    def _on_config_changed(self, changed: set[tuple[str, str]]):
+        if changed & {
+            ("server", "url"), ("server", "timeout"), ("server", "connect_timeout"),
+            ("server", "max_retries"), ("endpoints", "extra"), ("endpoints", "hedge"),
+            ("endpoints", "hedge_percentile"), ("endpoints", "hedge_min_delay"),
+        }:
+            pool = self._make_pool()
+            with self._pool_lock:
+                old_pool, self._pool = self._pool, pool
+            old_pool.retire()  # Requests still using it finish first
+            log.info(f"Transcription client reconfigured for {config.MLX_AUDIO_SERVER_URL}")
+        if changed & {("routing", "routes"), ("server", "model")}:
+            self._router = self._make_router()
+
+    def _acquire_pool(self) -> EndpointPool:
+        """The current pool, held until release() so a reconfiguration can't close it mid-request."""
+        with self._pool_lock:
+            pool = self._pool
+            pool.acquire()
+        return pool
 
     def transcribe(self, audio_bytes: bytes) -> str | None:
         if not audio_bytes:
             return None
 
+        seconds = audio_duration(audio_bytes)
+        if config.CHUNKING and seconds and seconds > config.CHUNK_MAX_SECONDS:
+            return self._transcribe_chunked(audio_bytes, seconds)
+        return self._transcribe_clip(audio_bytes, seconds)
+
+    def _transcribe_chunked(self, audio_bytes: bytes, seconds: float) -> str | None:
+        """Split a long clip at pauses and transcribe the chunks concurrently."""
+        start = time.monotonic()
+        audio = decode(audio_bytes)
+        fmt = audio_format(audio_bytes)
+        bounds = chunk_bounds(audio, config.SAMPLE_RATE, config.CHUNK_MIN_SECONDS, config.CHUNK_MAX_SECONDS)
+
+        def run(begin: int, end: int) -> str | None:
+            return self._transcribe_clip(encode(audio[begin:end], fmt), (end - begin) / config.SAMPLE_RATE)
+
+        futures = [self._chunk_pool.submit(run, begin, end) for begin, end in bounds]
+        texts = [future.result() for future in futures]
+        failed = sum(text is None for text in texts)
+        if failed:
+            log.warning(f"{failed} of {len(texts)} chunks returned no text")
+        log.info(f"Transcribed {seconds:.0f}s clip as {len(bounds)} chunks in {time.monotonic() - start:.2f}s")
+        return stitch([text for text in texts if text]) or None
+
+    def model_for(self, audio_bytes: bytes) -> str:
+        """The model a payload is (or was) sent to."""
+        return self._router.choose(audio_duration(audio_bytes)) if self._router else config.WHISPER_MODEL
+
+    def _transcribe_clip(self, audio_bytes: bytes, seconds: float | None) -> str | None:
+        router = self._router
+        model = router.choose(seconds) if router else config.WHISPER_MODEL
+
+        key = None
+        if self._cache is not None:
+            key = cache_key(audio_bytes, model, config.LANGUAGE)
+            text = self._cache.get(key)
+            if text is not None:
+                log.info(f"Cache hit (hits={self._cache.hits}, misses={self._cache.misses})")
+                return text
+            log.info(f"Cache miss (hits={self._cache.hits}, misses={self._cache.misses})")
+
+        start = time.monotonic()
+        payloads = {}  # Encoded once per format, shared by hedged requests
+
+        def request(endpoint: Endpoint) -> str | None:
+            if endpoint.format not in payloads:
+                payloads[endpoint.format] = transcode(audio_bytes, endpoint.format)
+            return self._request(endpoint, payloads[endpoint.format], model, seconds)
+
+        pool = self._acquire_pool()
         try:
-            audio_file = io.BytesIO(audio_bytes)
-            audio_file.name = "recording.wav"
+            text = pool.run(request)
+        finally:
+            pool.release()
+        if router:
+            router.record(model, seconds, time.monotonic() - start)
+        if text and key is not None:
+            self._cache.put(key, text)
+        return text
 
-            kwargs = {}
-            if config.LANGUAGE:
-                kwargs["language"] = config.LANGUAGE
+    def _request(self, endpoint: Endpoint, audio_bytes: bytes, model: str, seconds: float | None) -> str | None:
+        """One transcription call. Raises on failure so the pool can fail over."""
+        audio_file = io.BytesIO(audio_bytes)
+        audio_file.name = f"recording.{audio_format(audio_bytes)}"
 
-            response = self.client.audio.transcriptions.create(
-                model=config.WHISPER_MODEL,
-                file=audio_file,
-                **kwargs,
-            )
-            return response.text.strip() if response.text else None
-        except Exception:
+        kwargs = {}
+        if config.LANGUAGE:
+            kwargs["language"] = config.LANGUAGE
+
+        read_timeout = config.REQUEST_TIMEOUT + (seconds or 0) * _TIMEOUT_PER_AUDIO_SECOND
+        response = endpoint.client.audio.transcriptions.create(
+            model=model,
+            file=audio_file,
+            timeout=httpx.Timeout(read_timeout, connect=config.CONNECT_TIMEOUT),
+            **kwargs,
+        )
+        return response.text.strip() if response.text else None
+
+    def warm_up(self) -> float | None:
+        """Send a short synthetic clip so model load and kernel compilation
+        happen before the first real dictation. Returns the time taken."""
+        start = time.monotonic()
+        # Every routed model needs loading, not just the default one
+        models = self._router.models if self._router else [config.WHISPER_MODEL]
+        pool = self._acquire_pool()
+        try:
+            for endpoint in pool.endpoints:
+                for model in models:
+                    endpoint.client.audio.transcriptions.create(
+                        model=model,
+                        file=("warmup.wav", _warmup_clip()),
+                    )
+        except Exception as e:
+            log.warning(f"Warm-up request failed: {e}")
             return None
+        finally:
+            pool.release()
+        elapsed = time.monotonic() - start
+        log.info(f"Warm-up transcription took {elapsed:.2f}s")
+        return elapsed
+
+    def close(self):
+        self._chunk_pool.shutdown(wait=False)
+        self._pool.close()
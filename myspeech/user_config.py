@@ -1,11 +1,18 @@
 """User configuration file management.
 
-Creates and loads user configuration from ~/.config/myspeech/config.toml
+Creates and loads user configuration from ~/.config/myspeech/config.toml.
+The file is parsed once into an immutable snapshot; a watcher thread reloads
+it when its mtime changes and notifies subscribers of the changed keys.
 """
 
+import builtins
 import logging
+import threading
+import time
 import tomllib
 from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Mapping
 
 log = logging.getLogger(__name__)
 
@@ -20,6 +27,53 @@ DEFAULT_CONFIG = """\
 url = "http://localhost:8000/v1"
 model = "mlx-community/whisper-large-v3-turbo"
 language = ""  # ISO 639-1 code (e.g., "en", "bg", "de"). Empty = auto-detect
+format = "wav"  # Upload format: "wav" or "flac" (smaller uploads for remote/LAN servers)
+timeout = 30.0  # Seconds to wait for a transcription, plus one per second of audio
+connect_timeout = 2.0  # Seconds to wait for the connection
+max_retries = 1
+warmup = true  # Send a short clip at startup so the first dictation is fast
+workers = 1  # Requests the server started by MySpeech handles at once (each loads the model)
+
+[chunking]
+# Clips longer than max_seconds are split at pauses into min..max second chunks
+# that are transcribed concurrently, as many at once as [server] workers
+enabled = true
+min_seconds = 20.0
+max_seconds = 30.0
+# parallelism = 2  # Chunks in flight; defaults to [server] workers (raise for more [endpoints])
+
+[endpoints]
+# More servers besides [server] url, e.g. a LAN box. Requests go to the endpoint
+# with the best recent latency/error record and are hedged to the next one if
+# the first hasn't answered by its p95 latency.
+# e.g. extra = [{ url = "http://192.168.1.20:8000/v1", format = "flac" }]
+extra = []
+hedge = true
+hedge_percentile = 95
+hedge_min_delay = 0.3  # Never hedge sooner than this (seconds)
+
+[routing]
+# Send short clips to a faster model; clips longer than every route use [server] model
+# e.g. routes = [{ max_seconds = 3.0, model = "mlx-community/whisper-small-mlx" }]
+routes = []
+
+[cache]
+# Transcripts keyed by audio content + model + language; repeats skip the server
+enabled = true
+max_entries = 256  # In-memory LRU size
+disk = false  # Also keep transcripts on disk across restarts
+dir = "~/.cache/myspeech"
+max_disk_mb = 50
+
+[residency]
+# off: load at launch and keep loaded
+# keep_warm: periodic tiny transcription so the model isn't paged out
+# idle_unload: stop the server after idle_minutes, reload on next hotkey press
+# on_demand: like idle_unload, but don't load at launch
+mode = "off"
+keep_warm_interval = 600  # Seconds between keep-warm pings while idle
+idle_minutes = 30  # Minutes without dictation before unloading
+check_interval = 30  # Seconds between residency checks
 
 [audio]
 sample_rate = 16000
@@ -30,6 +84,38 @@ save_recording = true
 recording_path = "/tmp/myspeech_recording.wav"
 min_duration = 0.5  # Minimum seconds to accept recording
 min_level = 100  # Minimum audio level (prevents silent recordings)
+preroll = 0.0  # Seconds of audio kept from before the hotkey (keeps mic open; 0 = off)
+native_format = true  # Open the mic at its own rate/channels and resample to sample_rate mono
+stream_policy = "per_recording"  # Or "idle" (mic open until stream_idle_seconds pass) or "always" (open while running)
+stream_idle_seconds = 30.0
+blocksize = 0  # Frames per audio callback (0 = automatic)
+latency = "low"  # "low", "high" or seconds of input latency
+device_refresh = 0.0  # Seconds between checks for plugged/unplugged mics (0 = only when the menu opens)
+
+[archive]
+# Every dictation's audio (FLAC) and transcript, searchable with scripts/history.py
+enabled = true
+path = "~/Library/Application Support/MySpeech/history.db"
+max_mb = 500  # Oldest recordings are evicted beyond this size
+max_days = 30  # ...or after this many days
+
+[vad]
+# Voice activity detection: trims silence and skips clips without speech
+enabled = true
+min_rms = 200  # Minimum frame energy counted as speech
+min_speech = 0.2  # Seconds of speech required to send a clip
+padding = 0.2  # Seconds kept around detected speech
+
+[pipeline]
+workers = 2  # Dictations transcribed concurrently (results are still pasted in order)
+max_pending = 8  # Recorded dictations waiting for a worker
+
+[streaming]
+# Transcribe long dictations in segments while still recording (cut at pauses)
+enabled = false
+pause = 0.6  # Seconds of silence that end a segment
+min_segment = 5.0  # Minimum segment length in seconds
+workers = 2  # Segments transcribed in parallel
 
 [hotkey]
 # Modifiers: cmd, ctrl, alt, shift (separated by +)
@@ -38,6 +124,13 @@ record_key = "t"  # Hold to record (Cmd+Ctrl+T)
 open_recording_key = "r"  # Open last recording (Cmd+Ctrl+R)
 debounce_seconds = 0.5
 
+[tracing]
+# Per-dictation stage timings as JSON lines (empty = log only)
+path = "~/Library/Logs/MySpeech-traces.jsonl"
+# Seconds between background memory samples, and how many samples to keep
+memory_interval = 10.0
+memory_history = 360
+
 [clipboard]
 # paste_delay: Seconds to wait for target app to activate before pasting
 paste_delay = 0.1
@@ -58,6 +151,31 @@ def ensure_config_exists() -> None:
         log.info(f"Created default config at {CONFIG_FILE}")
 
 
+_MISSING = object()
+
+_lock = threading.Lock()
+_snapshot: Mapping | None = None
+_mtime: float | None = None
+_defaults: dict[tuple[str, str], object] = {}
+_subscribers: list[Callable[[set[tuple[str, str]]], None]] = []
+_watcher: threading.Thread | None = None
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _file_mtime() -> float | None:
+    try:
+        return CONFIG_FILE.stat().st_mtime
+    except OSError:
+        return None
+
+
 def load_config() -> dict:
     """Load configuration from user config file."""
     ensure_config_exists()
@@ -69,10 +187,84 @@ def load_config() -> dict:
         return {}
 
 
-def get(section: str, key: str, default):
-    """Get a config value with fallback to default."""
-    config = load_config()
-    return config.get(section, {}).get(key, default)
+def snapshot() -> Mapping:
+    """The current parsed config as a read-only mapping (parsed on first use)."""
+    global _snapshot, _mtime
+    if _snapshot is None:
+        with _lock:
+            if _snapshot is None:
+                ensure_config_exists()
+                _mtime = _file_mtime()
+                _snapshot = _freeze(load_config())
+    return _snapshot
+
+
+def get(section: str, key: str, default=_MISSING):
+    """Get a config value with fallback to default.
+
+    The default is remembered, so later lookups (e.g. on reload) may omit it.
+    """
+    if default is _MISSING:
+        default = _defaults.get((section, key))
+    else:
+        _defaults[(section, key)] = default
+    return snapshot().get(section, {}).get(key, default)
+
+
+def subscribe(callback: Callable[[set[tuple[str, str]]], None]):
+    """Call `callback(changed)` with the changed (section, key) pairs after each reload.
+
+    Subscribers are notified in registration order.
+    """
+    _subscribers.append(callback)
+
+
+def _diff(old: Mapping, new: Mapping) -> set[tuple[str, str]]:
+    sections = {section: (old.get(section, {}), new.get(section, {})) for section in (*old, *new)}
+    return {
+        (section, key)
+        for section, (old_section, new_section) in sections.items()
+        if isinstance(old_section, Mapping) and isinstance(new_section, Mapping)
+        for key in (*old_section, *new_section)
+        if old_section.get(key, _MISSING) != new_section.get(key, _MISSING)
+    }
+
+
+def reload_if_changed() -> set[tuple[str, str]]:
+    """Re-parse the file if its mtime changed. Returns the changed keys."""
+    global _snapshot, _mtime
+    mtime = _file_mtime()
+    with _lock:
+        if _snapshot is not None and mtime == _mtime:
+            return builtins.set()
+        old = _snapshot or MappingProxyType({})
+        _mtime = mtime
+        _snapshot = _freeze(load_config())
+        changed = _diff(old, _snapshot)
+
+    if changed:
+        log.info("Config reloaded: " + ", ".join(f"{s}.{k}" for s, k in sorted(changed)))
+        for callback in list(_subscribers):
+            try:
+                callback(changed)
+            except Exception as e:
+                log.warning(f"Config subscriber failed: {e}")
+    return changed
+
+
+def start_watcher(interval: float = 2.0):
+    """Poll the config file's mtime in the background and reload on change."""
+    global _watcher
+    if _watcher is not None:
+        return
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            reload_if_changed()
+
+    _watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+    _watcher.start()
 
 
 def set(section: str, key: str, value) -> bool:
@@ -126,6 +318,7 @@ def set(section: str, key: str, value) -> bool:
         if updated:
             CONFIG_FILE.write_text('\n'.join(lines))
             log.info(f"Updated config: [{section}] {key} = {toml_value}")
+            reload_if_changed()
             return True
         else:
             log.warning(f"Could not find [{section}] {key} in config file")
@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def block_level(block: np.ndarray) -> float:
+    """Mean absolute amplitude of an int16 block."""
+    return float(np.abs(block.astype(np.int32)).mean()) if len(block) else 0.0
+
+
+@dataclass(frozen=True)
+class AudioStats:
+    samples: int = 0
+    level: float = 0.0  # Mean absolute amplitude
+    rms: float = 0.0
+    peak: int = 0  # Largest absolute amplitude, up to 32768
+    clipped: int = 0  # Samples at full scale
+    voiced_frames: int = 0  # Frames whose RMS reaches the threshold
+    frame_samples: int = 1
+
+    @property
+    def voiced_samples(self) -> int:
+        return self.voiced_frames * self.frame_samples
+
+    @property
+    def peak_dbfs(self) -> float:
+        return float(20 * np.log10(self.peak / 32768)) if self.peak else float("-inf")
+
+
+class StreamStats:
+    """Running level statistics over a live stream of int16 blocks.
+
+    Fed one block at a time by the audio callback (the only writer); the
+    totals are republished as an immutable AudioStats after every block, so
+    readers get a consistent snapshot without a lock or a pass over the
+    clip. Voiced frames use the same fixed framing as frame_features() on
+    the whole recording, carrying partial frames across blocks, and count
+    frames with RMS >= min_rms: an upper bound on speech_frames(), whose
+    threshold is never lower.
+    """
+
+    def __init__(self, sample_rate: int, min_rms: float, frame_ms: int = 30):
+        self._frame = max(int(sample_rate * frame_ms / 1000), 2)
+        # Sum of squares per voiced frame, a hair low so float rounding never undercounts
+        self._threshold = float(min_rms) ** 2 * self._frame * 0.999
+        self._samples = 0
+        self._sum_abs = 0
+        self._sum_sq = 0.0
+        self._peak = 0
+        self._clipped = 0
+        self._voiced = 0
+        self._partial = np.empty(0, dtype=np.float32)  # Squares of the unfinished frame
+        self.snapshot = AudioStats(frame_samples=self._frame)
+
+    def feed(self, block: np.ndarray):
+        if not len(block):
+            return
+        mono = block.reshape(len(block), -1)[:, 0] if block.ndim > 1 else block
+        wide = np.abs(mono.astype(np.int32))
+        self._samples += len(mono)
+        self._sum_abs += int(wide.sum())
+        peak = int(wide.max())
+        self._peak = max(self._peak, peak)
+        if peak >= 32767:
+            self._clipped += int(np.count_nonzero(wide >= 32767))
+
+        squares = mono.astype(np.float32)
+        squares *= squares
+        self._sum_sq += float(squares.sum(dtype=np.float64))
+        if len(self._partial):
+            squares = np.concatenate([self._partial, squares])
+        n_frames = len(squares) // self._frame
+        if n_frames:
+            energy = squares[:n_frames * self._frame].reshape(n_frames, self._frame).sum(axis=1)
+            self._voiced += int(np.count_nonzero(energy >= self._threshold))
+        self._partial = squares[n_frames * self._frame:]
+
+        self.snapshot = AudioStats(
+            samples=self._samples,
+            level=self._sum_abs / self._samples,
+            rms=(self._sum_sq / self._samples) ** 0.5,
+            peak=self._peak,
+            clipped=self._clipped,
+            voiced_frames=self._voiced,
+            frame_samples=self._frame,
+        )
+
+
+class PauseDetector:
+    """Detects natural pauses in a live stream of audio blocks.
+
+    Fed one PortAudio block at a time; reports when the current segment has
+    reached the minimum length, contains speech, and has been followed by a
+    long enough run of silence to be cut off and transcribed on its own.
+    """
+
+    def __init__(self, sample_rate: int, threshold: float, pause_seconds: float, min_segment_seconds: float):
+        self._threshold = threshold
+        self._pause_samples = int(pause_seconds * sample_rate)
+        self._min_segment_samples = int(min_segment_seconds * sample_rate)
+        self.reset()
+
+    def reset(self):
+        self._samples = 0
+        self._silent_samples = 0
+        self._voiced = False
+
+    def feed(self, block: np.ndarray) -> bool:
+        """Account for a new block. Returns True if the segment should be cut after it."""
+        n = len(block)
+        self._samples += n
+        if block_level(block) < self._threshold:
+            self._silent_samples += n
+        else:
+            self._silent_samples = 0
+            self._voiced = True
+
+        if (
+            self._voiced
+            and self._samples >= self._min_segment_samples
+            and self._silent_samples >= self._pause_samples
+        ):
+            self.reset()
+            return True
+        return False
+
+
+def frame_features(audio: np.ndarray, frame_samples: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-frame RMS energy and zero-crossing rate of int16 audio (mono or multi-channel)."""
+    mono = audio.reshape(len(audio), -1)[:, 0] if audio.ndim > 1 else audio
+    n_frames = len(mono) // frame_samples
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+    frames = mono[:n_frames * frame_samples].reshape(n_frames, frame_samples).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_samples - 1)
+    return rms, zcr.astype(np.float32)
+
+
+def speech_frames(
+    audio: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 30,
+    min_rms: float = 200.0,
+    noise_ratio: float = 3.0,
+    max_zcr: float = 0.35,
+) -> np.ndarray:
+    """Classify fixed-size frames as speech (True) or silence/noise (False).
+
+    A frame is speech when its energy clears both an absolute floor and a
+    multiple of the clip's own noise floor (10th percentile frame energy).
+    Low-energy frames with a very high zero-crossing rate are hiss, not voice,
+    so they need twice the energy to count.
+    """
+    frame_samples = max(int(sample_rate * frame_ms / 1000), 2)
+    rms, zcr = frame_features(audio, frame_samples)
+    if not len(rms):
+        return np.zeros(0, dtype=bool)
+    threshold = max(min_rms, float(np.percentile(rms, 10)) * noise_ratio)
+    return (rms >= threshold) & ((zcr <= max_zcr) | (rms >= 2 * threshold))
+
+
+def speech_bounds(
+    audio: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 30,
+    min_rms: float = 200.0,
+    min_speech_seconds: float = 0.2,
+    padding_seconds: float = 0.2,
+) -> tuple[int, int] | None:
+    """Sample range [start, end) that contains speech plus padding, or None if there is no speech."""
+    frame_samples = max(int(sample_rate * frame_ms / 1000), 2)
+    voiced = speech_frames(audio, sample_rate, frame_ms=frame_ms, min_rms=min_rms)
+    if np.count_nonzero(voiced) * frame_samples < min_speech_seconds * sample_rate:
+        return None
+
+    indices = np.flatnonzero(voiced)
+    padding = int(padding_seconds * sample_rate)
+    start = max(int(indices[0]) * frame_samples - padding, 0)
+    end = min((int(indices[-1]) + 1) * frame_samples + padding, len(audio))
+    return start, end
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int, **kwargs) -> np.ndarray | None:
+    """Trim leading and trailing silence. Returns a view, or None if there is no speech."""
+    bounds = speech_bounds(audio, sample_rate, **kwargs)
+    if bounds is None:
+        return None
+    return audio[bounds[0]:bounds[1]]
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Replay key events through the hotkey state machine.
+
+Feeds a synthetic typing stream (or a recorded one) through
+myspeech.hotkey_state the way HotkeyListener does, including a dispatcher
+thread, and reports per-event overhead for ordinary keys, the suppression
+check and the time from the completing key press to the record callback.
+No keyboard, pynput or Quartz needed.
+
+Recorded streams are JSON lines: {"type": "press"|"release", "vk": 17, "modifier": "cmd"|null}
+
+Usage:
+    python scripts/bench_hotkey.py --events 200000 --dictations 500
+    python scripts/bench_hotkey.py --replay keys.jsonl
+"""
+
+import argparse
+import json
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from myspeech import hotkey_state  # noqa: E402
+from myspeech.hotkey_state import HotkeyBindings, HotkeyState  # noqa: E402
+
+RECORD_VK = 17  # 't' on a US layout
+OPEN_VK = 15  # 'r'
+LETTER_VKS = [vk for vk in range(51) if vk not in (RECORD_VK, OPEN_VK)]
+
+
+def synthetic_events(count: int, dictations: int, seed: int = 0) -> list[tuple[str, str | None, int | None]]:
+    """Typing with occasional shift, interleaved with cmd+ctrl+T dictations."""
+    rng = random.Random(seed)
+    events = []
+    # A keystroke is ~2.1 events, a dictation 6
+    keystrokes = max((count // max(dictations, 1) - 6) // 2, 1)
+    while len(events) < count:
+        for _ in range(keystrokes):
+            vk = rng.choice(LETTER_VKS)
+            shifted = rng.random() < 0.05
+            if shifted:
+                events.append(("press", "shift", 56))
+            events += [("press", None, vk), ("release", None, vk)]
+            if shifted:
+                events.append(("release", "shift", 56))
+        if dictations:
+            events += [
+                ("press", "cmd", 55), ("press", "ctrl", 59), ("press", None, RECORD_VK),
+                ("release", None, RECORD_VK), ("release", "ctrl", 59), ("release", "cmd", 55),
+            ]
+    return events[:count]
+
+
+def load_events(path: Path) -> list[tuple[str, str | None, int | None]]:
+    events = []
+    for line in path.read_text().splitlines():
+        if line.strip():
+            record = json.loads(line)
+            events.append((record["type"], record.get("modifier"), record.get("vk")))
+    return events
+
+
+def ns_stats(samples: list[int]) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ns": ordered[len(ordered) // 2],
+        "p99_ns": ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)],
+        "mean_ns": round(statistics.fmean(samples)),
+    }
+
+
+def replay(events: list[tuple[str, str | None, int | None]]) -> dict:
+    bindings = HotkeyBindings.create(frozenset({"cmd", "ctrl"}), RECORD_VK, OPEN_VK, debounce=0.0)
+    state = HotkeyState()
+
+    # Same shape as HotkeyListener: callbacks run on one dispatcher thread
+    callbacks: queue.SimpleQueue = queue.SimpleQueue()
+    detection_ns: list[int] = []
+    delivered = threading.Event()
+
+    def dispatch_loop():
+        while (item := callbacks.get()) is not None:
+            action, queued = item
+            if action == hotkey_state.RECORD_START:
+                detection_ns.append(time.perf_counter_ns() - queued)
+                delivered.set()
+
+    dispatcher = threading.Thread(target=dispatch_loop, daemon=True)
+    dispatcher.start()
+
+    typing_ns, hotkey_ns, suppress_ns = [], [], []
+    clock = time.perf_counter_ns
+    overhead = min(-(clock() - clock()) for _ in range(1000))  # Cost of the timing itself
+    for kind, modifier, vk in events:
+        transition = hotkey_state.press if kind == "press" else hotkey_state.release
+        start = clock()
+        # The intercept runs before the listener callback for every event
+        if state.suppressing and vk is not None:
+            hotkey_state.should_suppress(state, bindings, vk)
+        mid = clock()
+        state, actions = transition(state, bindings, modifier, vk, start / 1e9)
+        for action in actions:
+            callbacks.put((action, start))
+        end = clock()
+        suppress_ns.append(mid - start - overhead)
+        (hotkey_ns if actions or modifier or vk in bindings.tracked_vks else typing_ns).append(end - mid - overhead)
+        if hotkey_state.RECORD_START in actions:
+            # A real listener goes idle between key events; don't let the
+            # replay loop starve the dispatcher of the GIL
+            delivered.wait()
+            delivered.clear()
+
+    callbacks.put(None)
+    dispatcher.join()
+    return {
+        "events": len(events),
+        "clock_overhead_ns": overhead,
+        "typing_event": ns_stats(typing_ns),
+        "hotkey_event": ns_stats(hotkey_ns),
+        "intercept": ns_stats(suppress_ns),
+        "press_to_record_callback": ns_stats(detection_ns),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000, help="Synthetic events to generate")
+    parser.add_argument("--dictations", type=int, default=500, help="Record hotkeys mixed into the stream")
+    parser.add_argument("--replay", type=Path, help="Recorded JSON-lines event stream to use instead")
+    args = parser.parse_args()
+
+    events = load_events(args.replay) if args.replay else synthetic_events(args.events, args.dictations)
+    print(json.dumps(replay(events), indent=2))
+
+
+if __name__ == "__main__":
+    main()
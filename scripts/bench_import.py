@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Import-time budget for `import myspeech.app`.
+
+Runs `python -c "import myspeech.app"` in fresh interpreters and fails when the
+median wall time exceeds the budget, so heavy imports creeping back into the
+module top level show up as a regression. With --profile, uses
+`python -X importtime` to report the most expensive modules instead.
+
+Usage:
+    python scripts/bench_import.py --budget 0.3
+    python scripts/bench_import.py --profile --top 25
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+STATEMENT = "import myspeech.app"
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def time_import(runs: int) -> list[float]:
+    """Wall-clock seconds per fresh interpreter, minus bare interpreter startup."""
+    def once(statement: str) -> float:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, env=_env(), check=True)
+        return time.perf_counter() - start
+
+    once(STATEMENT)  # Warm the bytecode cache and the OS file cache
+    baseline = statistics.median(once("pass") for _ in range(runs))
+    return [max(once(STATEMENT) - baseline, 0.0) for _ in range(runs)]
+
+
+def profile_imports() -> list[tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) from `-X importtime`, most expensive first."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STATEMENT],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=0.3, help="Maximum median import time in seconds")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters to time")
+    parser.add_argument("--profile", action="store_true", help="Report per-module import cost instead")
+    parser.add_argument("--top", type=int, default=20, help="Modules to show with --profile")
+    args = parser.parse_args()
+
+    if args.profile:
+        rows = profile_imports()
+        print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+        for name, self_us, cumulative_us in rows[:args.top]:
+            print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+        return
+
+    times = time_import(args.runs)
+    median = statistics.median(times)
+    print(f"{STATEMENT}: median {median * 1000:.0f} ms, min {min(times) * 1000:.0f} ms, "
+          f"max {max(times) * 1000:.0f} ms over {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+    if median > args.budget:
+        print("Import-time budget exceeded; run with --profile to find the culprit", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""End-to-end pipeline benchmark against the stub transcription server.
+
+Feeds a corpus of WAV files through the real Recorder capture/encode path
+(blocks are pushed into the audio callback, no microphone needed) and the
+real Transcriber, talking to scripts/stub_server.py in-process. Prints a JSON
+report with latency percentiles, throughput and peak memory that can be
+diffed between commits.
+
+Usage:
+    python scripts/bench_pipeline.py --corpus ~/recordings --output bench.json
+    python scripts/bench_pipeline.py --synthetic 20 --latency 0.3 --jitter 0.1
+    python scripts/bench_pipeline.py --synthetic 20 --compare bench.json
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import config  # noqa: E402
+from stub_server import add_arguments, serve, settings_from_args  # noqa: E402
+
+BLOCK_SAMPLES = 512  # Typical PortAudio block at 16 kHz
+
+
+def load_wav(path: Path) -> np.ndarray | None:
+    """Read a 16-bit WAV as (samples, channels) int16, or None if the format doesn't match."""
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2 or wf.getframerate() != config.SAMPLE_RATE or wf.getnchannels() != config.CHANNELS:
+            print(f"skipping {path.name}: need 16-bit {config.SAMPLE_RATE} Hz x{config.CHANNELS}", file=sys.stderr)
+            return None
+        data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return data.reshape(-1, config.CHANNELS)
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> list[np.ndarray]:
+    """Tone bursts separated by pauses, 1-30 s long, over a low noise floor."""
+    rng = np.random.default_rng(seed)
+    sr = config.SAMPLE_RATE
+    clips = []
+    for _ in range(count):
+        seconds = float(rng.uniform(1, 30))
+        n = int(seconds * sr)
+        audio = rng.normal(0, 40, n)
+        t = np.arange(n) / sr
+        envelope = (np.sin(2 * np.pi * t / 3) > -0.3).astype(float)  # ~1 s pause every 3 s
+        audio += 3000 * envelope * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+        clip = np.clip(audio, -32768, 32767).astype(np.int16)
+        clips.append(np.repeat(clip[:, None], config.CHANNELS, axis=1))
+    return clips
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {}
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {"p50": round(p50 * 1000, 1), "p95": round(p95 * 1000, 1), "p99": round(p99 * 1000, 1),
+            "mean": round(float(np.mean(values)) * 1000, 1)}
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(clips: list[np.ndarray], port: int, audio_format: str | None = None) -> dict:
+    # Point the real components at the stub and keep the run side-effect free
+    config.MLX_AUDIO_SERVER_URL = f"http://127.0.0.1:{port}/v1"
+    if audio_format:
+        config.AUDIO_FORMAT = audio_format
+    config.SAVE_RECORDING = False
+    config.CACHE_ENABLED = False
+
+    from myspeech.devices import DeviceRegistry
+    from myspeech.recorder import Recorder
+    from myspeech.transcriber import Transcriber
+
+    recorder = Recorder(DeviceRegistry(0))
+    recorder.ensure_stream = lambda: None  # No microphone: the harness feeds the callback
+    transcriber = Transcriber()
+
+    stop_times, transcribe_times, totals, payload_sizes = [], [], [], []
+    errors = rejected = 0
+    audio_seconds = 0.0
+    wall_start = time.monotonic()
+
+    for clip in clips:
+        audio_seconds += len(clip) / config.SAMPLE_RATE
+        recorder.start()
+        for i in range(0, len(clip), BLOCK_SAMPLES):
+            block = clip[i:i + BLOCK_SAMPLES]
+            recorder._audio_callback(block, len(block), None, None)
+
+        release = time.monotonic()
+        payload = recorder.stop()
+        stopped = time.monotonic()
+        stop_times.append(stopped - release)
+        if not payload:
+            rejected += 1
+            continue
+        payload_sizes.append(len(payload))
+
+        text = transcriber.transcribe(payload)
+        done = time.monotonic()
+        transcribe_times.append(done - stopped)
+        totals.append(done - release)
+        if not text:
+            errors += 1
+
+    wall = time.monotonic() - wall_start
+    transcriber.close()
+    return {
+        "commit": git_commit(),
+        "clips": len(clips),
+        "rejected": rejected,
+        "errors": errors,
+        "audio_seconds": round(audio_seconds, 1),
+        "format": config.AUDIO_FORMAT,
+        "payload_kb_mean": round(float(np.mean(payload_sizes)) / 1024, 1) if payload_sizes else 0,
+        "stop_ms": percentiles(stop_times),
+        "transcribe_ms": percentiles(transcribe_times),
+        "release_to_text_ms": percentiles(totals),
+        "throughput_clips_per_s": round(len(clips) / wall, 2),
+        "realtime_factor": round(audio_seconds / wall, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(report: dict, baseline: dict):
+    """Print p50/p95 changes against a previous report."""
+    for section in ("stop_ms", "transcribe_ms", "release_to_text_ms"):
+        for key in ("p50", "p95"):
+            new, old = report.get(section, {}).get(key), baseline.get(section, {}).get(key)
+            if new is None or not old:
+                continue
+            print(f"{section}.{key}: {old} -> {new} ({(new - old) * 100 / old:+.1f}%)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", type=Path, help="Directory of 16-bit WAV files")
+    source.add_argument("--synthetic", type=int, metavar="N", help="Generate N synthetic clips")
+    parser.add_argument("--port", type=int, default=8799, help="Port for the in-process stub server")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="Previous JSON report to compare against")
+    parser.add_argument("--format", choices=("wav", "flac"), help="Override [server] format")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.corpus:
+        clips = [c for c in (load_wav(p) for p in sorted(args.corpus.glob("*.wav"))) if c is not None]
+    else:
+        clips = synthetic_corpus(args.synthetic)
+    if not clips:
+        parser.error("no usable clips")
+
+    server = serve(args.port, settings_from_args(args))
+    try:
+        report = run(clips, args.port, args.format)
+    finally:
+        server.shutdown()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
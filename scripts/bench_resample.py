@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Measure the cost of converting native device audio to the capture format.
+
+Feeds synthetic speech-band audio through myspeech.resample.Resampler in
+callback-sized blocks, the way the audio callback does, and reports the
+CPU time per second of audio for each source rate and channel count.
+With --paced, blocks arrive at the device's real rate, so caches are cold
+between callbacks as they are in the app (slower, but closer to the truth).
+
+Usage:
+    python scripts/bench_resample.py
+    python scripts/bench_resample.py --rates 44100 48000 --channels 2 --blocksize 256
+    python scripts/bench_resample.py --rates 48000 --paced --seconds 3
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from myspeech.resample import Resampler  # noqa: E402
+
+
+def synthetic_audio(rate: int, channels: int, seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    voice = sum(np.sin(2 * np.pi * f * t + rng.uniform(0, np.pi)) for f in (180, 720, 2400))
+    audio = voice * 3000 + rng.normal(0, 200, len(t))
+    return np.repeat(audio[:, None], channels, axis=1).astype(np.int16)
+
+
+def run(rate: int, channels: int, target: int, blocksize: int, audio: np.ndarray, paced: bool) -> float:
+    """Seconds of CPU spent converting `audio` block by block."""
+    resampler = Resampler(rate, target, channels, 1)
+    elapsed = 0.0
+    for i in range(0, len(audio), blocksize):
+        start = time.thread_time()
+        resampler.process(audio[i:i + blocksize])
+        elapsed += time.thread_time() - start
+        if paced:
+            time.sleep(blocksize / rate)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 22050, 32000, 44100, 48000, 96000])
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--target", type=int, default=16000, help="Capture sample rate")
+    parser.add_argument("--blocksize", type=int, default=512, help="Frames per callback block")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Audio per run")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--paced", action="store_true", help="Sleep one block duration between blocks")
+    args = parser.parse_args()
+
+    print(f"{'source':>14} {'ms CPU / s audio':>17} {'realtime x':>11} {'us / block':>11}")
+    for rate in args.rates:
+        for channels in args.channels:
+            audio = synthetic_audio(rate, channels, args.seconds)
+            cost = statistics.median(
+                run(rate, channels, args.target, args.blocksize, audio, args.paced) for _ in range(args.runs)
+            ) / args.seconds
+            blocks_per_second = rate / args.blocksize
+            print(
+                f"{rate:>8} Hz x{channels} {cost * 1000:>17.2f} {1 / max(cost, 1e-9):>11.0f}"
+                f" {cost / blocks_per_second * 1e6:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
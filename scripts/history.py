@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Search and export past dictations from the recording archive.
+
+Usage:
+    python scripts/history.py search "quarterly report" --limit 10
+    python scripts/history.py recent
+    python scripts/history.py export 42 ~/Desktop/dictation.flac
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import config  # noqa: E402
+from myspeech.archive import connect, search  # noqa: E402
+
+
+def show(rows: list[sqlite3.Row]):
+    for row in rows:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created"]))
+        timings = json.loads(row["timings"] or "{}")
+        latency = f", {timings['release_to_paste']:.0f} ms" if "release_to_paste" in timings else ""
+        print(f"[{row['id']}] {when} {row['duration']:.1f}s {row['outcome']} ({row['model'] or '-'}{latency})")
+        if row["text"]:
+            print(f"    {row['text']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", type=Path, default=Path(config.ARCHIVE_PATH).expanduser(), help="Archive database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search_parser = commands.add_parser("search", help="Full-text search over transcripts")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=20)
+    recent_parser = commands.add_parser("recent", help="Most recent dictations")
+    recent_parser.add_argument("--limit", type=int, default=20)
+    export_parser = commands.add_parser("export", help="Write a recording's audio to a file")
+    export_parser.add_argument("id", type=int)
+    export_parser.add_argument("output", type=Path)
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        parser.error(f"no archive at {args.db}")
+    db, fts = connect(args.db)
+    db.row_factory = sqlite3.Row
+
+    if args.command == "search":
+        show(search(db, args.query, args.limit, fts))
+    elif args.command == "recent":
+        show(db.execute("SELECT * FROM recordings ORDER BY created DESC LIMIT ?", (args.limit,)).fetchall())
+    else:
+        row = db.execute("SELECT format, audio FROM recordings WHERE id = ?", (args.id,)).fetchone()
+        if row is None:
+            parser.error(f"no recording {args.id}")
+        args.output.write_bytes(row["audio"])
+        print(f"Wrote {args.output} ({row['format']}, {len(row['audio']) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
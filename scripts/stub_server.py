@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""OpenAI-compatible stub transcription server for benchmarks.
+
+Answers GET /v1/models and POST /v1/audio/transcriptions with a fixed text
+after a configurable delay, so the client pipeline can be measured without
+a Mac, a microphone or a real mlx-audio server.
+
+Usage:
+    python scripts/stub_server.py --port 8765 --latency 0.3 --jitter 0.05 --error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class StubSettings:
+    latency: float = 0.3  # Fixed seconds per request
+    jitter: float = 0.0  # Uniform +/- seconds added to latency
+    per_mb: float = 0.0  # Extra seconds per MB of uploaded payload
+    error_rate: float = 0.0  # Fraction of requests answered with HTTP 500
+    workers: int = 1  # Concurrent requests processed (like mlx_audio.server --workers)
+    text: str = "stub transcription"
+
+
+def _make_handler(settings: StubSettings):
+    slots = threading.Semaphore(settings.workers)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+        # Headers and body go out in separate writes; with Nagle on, the body waits
+        # for the client's delayed ACK (~40 ms), which would swamp what the bench measures
+        disable_nagle_algorithm = True
+
+        def _reply(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._reply(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            if not self.path.rstrip("/").endswith("/audio/transcriptions"):
+                self._reply(404, {"error": "not found"})
+                return
+
+            with slots:
+                delay = settings.latency + random.uniform(-settings.jitter, settings.jitter)
+                delay += settings.per_mb * length / (1024 * 1024)
+                time.sleep(max(delay, 0.0))
+            if random.random() < settings.error_rate:
+                self._reply(500, {"error": "stub error"})
+            else:
+                self._reply(200, {"text": settings.text})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port: int, settings: StubSettings) -> ThreadingHTTPServer:
+    """Start the stub server on a background thread and return it."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(settings))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in seconds")
+    parser.add_argument("--per-mb", type=float, default=0.0, help="Extra seconds per MB uploaded")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent requests processed")
+
+
+def settings_from_args(args: argparse.Namespace) -> StubSettings:
+    return StubSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        per_mb=args.per_mb,
+        error_rate=args.error_rate,
+        workers=args.workers,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = serve(args.port, settings_from_args(args))
+    print(f"Stub server on http://127.0.0.1:{args.port}/v1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ OPTIONS = {
         'myspeech',
         'pynput',
         'sounddevice',
+        'soundfile',
         'numpy',
         'openai',
     ],
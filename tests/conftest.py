@@ -0,0 +1,12 @@
+import os
+import shutil
+import tempfile
+
+# Importing myspeech pulls in config, whose first read creates ~/.config/myspeech/config.toml.
+# Point HOME at a scratch directory before any test module is collected.
+_HOME = tempfile.mkdtemp(prefix="myspeech-home-")
+os.environ["HOME"] = _HOME
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_HOME, ignore_errors=True)
@@ -0,0 +1,80 @@
+import os
+import time
+from pathlib import Path
+
+from myspeech.resources import ProcProvider, ResourceSampler
+
+MEMINFO = """MemTotal:       16384000 kB
+MemFree:         2048000 kB
+MemAvailable:    4096000 kB
+Buffers:          102400 kB
+"""
+
+
+def make_proc(root: Path, processes: dict[int, tuple[bytes, int]]) -> Path:
+    """A fake /proc tree: meminfo plus <pid>/cmdline and <pid>/status (VmRSS in kB)."""
+    root.mkdir(exist_ok=True)
+    (root / "meminfo").write_text(MEMINFO)
+    (root / "self").mkdir(exist_ok=True)  # Non-numeric entries are skipped
+    for pid, (cmdline, rss_kb) in processes.items():
+        (root / str(pid)).mkdir(exist_ok=True)
+        (root / str(pid) / "cmdline").write_bytes(cmdline)
+        (root / str(pid) / "status").write_text(f"Name:\tpython\nVmRSS:\t{rss_kb} kB\nThreads:\t4\n")
+    return root
+
+
+def test_proc_provider_reads_fake_tree(tmp_path):
+    root = make_proc(
+        tmp_path / "proc",
+        {
+            100: (b"python\x00-m\x00myspeech\x00", 200 * 1024),
+            200: (b"python\x00-m\x00mlx_audio.server\x00--port\x008000\x00", 3000 * 1024),
+            201: (b"python\x00-m\x00mlx_audio.server\x00--worker\x00", 1000 * 1024),
+        },
+    )
+    provider = ProcProvider(root)
+
+    assert provider.process_mb(100) == 200
+    assert provider.process_mb(999) == 0  # Missing process
+    assert provider.server_mb() == 4000  # Summed over server processes
+    assert provider.system_memory() == (16000, 12000, 4000)
+
+
+def test_proc_provider_without_server_or_meminfo(tmp_path):
+    root = make_proc(tmp_path / "proc", {100: (b"python\x00", 1024)})
+    provider = ProcProvider(root)
+    assert provider.server_mb() is None
+
+    (root / "meminfo").write_text("MemTotal: 1024 kB\n")  # No MemAvailable
+    assert provider.system_memory() is None
+
+
+def test_sampler_samples_on_interval_and_latest_is_cached(tmp_path):
+    root = make_proc(tmp_path / "proc", {os.getpid(): (b"python\x00", 300 * 1024)})
+    provider = ProcProvider(root)
+    calls = []
+    system_memory = provider.system_memory
+    provider.system_memory = lambda: calls.append(1) or system_memory()
+
+    sampler = ResourceSampler(provider, interval=0.05, history=3)
+    assert sampler.latest() is None
+    sampler.start()
+    try:
+        deadline = time.monotonic() + 2
+        while len(sampler.history()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sample = sampler.latest()
+        assert sample is not None
+        assert sample.app_mb == 300
+        assert sample.server_mb is None
+        assert sample.system == (16000, 12000, 4000)
+
+        # Reading never samples; the history ring is bounded
+        before = len(calls)
+        for _ in range(100):
+            sampler.latest()
+        assert len(calls) - before <= 2  # Only the interval (a tick or two) may have sampled
+        time.sleep(0.2)
+        assert len(sampler.history()) == 3
+    finally:
+        sampler.stop()